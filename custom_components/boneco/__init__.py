@@ -2,20 +2,46 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from homeassistant.components import bluetooth
 from homeassistant.const import CONF_ADDRESS, CONF_PASSWORD, CONF_SENSOR_TYPE
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.importlib import async_import_module
+from homeassistant.helpers.typing import ConfigType
 from pyboneco import BonecoAuth, BonecoDeviceClass
 
-from .const import PLATFORMS_BY_TYPE
+from .capabilities import get_platforms
+from .const import CONF_ENTRY_TYPE, DOMAIN, ENTRY_TYPE_FLEET, FLEET_PLATFORMS
 from .coordinator import BonecoConfigEntry, BonecoDataUpdateCoordinator
+from .services import async_setup_services
+
+if TYPE_CHECKING:
+    from .fleet import BonecoFleetConfigEntry
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Boneco integration."""
+    async_setup_services(hass)
+    # Not needed to import the integration, so only loaded to register them
+    websocket = await async_import_module(hass, f"{__package__}.websocket")
+    websocket.async_setup_websocket_api(hass)
+    http = await async_import_module(hass, f"{__package__}.http")
+    http.async_setup_http(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: BonecoConfigEntry) -> bool:
     """Set up Boneco from a config entry."""
     assert entry.unique_id is not None
 
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET:
+        return await _async_setup_fleet_entry(hass, entry)
+
     address = entry.data[CONF_ADDRESS]
     device_key = entry.data[CONF_PASSWORD]
     device_class = BonecoDeviceClass(entry.data[CONF_SENSOR_TYPE])
@@ -34,11 +60,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: BonecoConfigEntry) -> bo
         device_class,
     )
     await coordinator.async_config_entry_first_refresh()
+    # Platforms without entities for this model aren't loaded at all
+    coordinator.platforms = get_platforms(device_class, coordinator.data)
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
-    await hass.config_entries.async_forward_entry_setups(
-        entry, PLATFORMS_BY_TYPE[device_class]
-    )
+    await hass.config_entries.async_forward_entry_setups(entry, coordinator.platforms)
+
+    return True
+
 
+async def _async_setup_fleet_entry(
+    hass: HomeAssistant, entry: BonecoFleetConfigEntry
+) -> bool:
+    """Set up aggregates over all Boneco devices."""
+    # Only loaded when the fleet entry is set up
+    fleet_module = await async_import_module(hass, f"{__package__}.fleet")
+    fleet = entry.runtime_data = fleet_module.BonecoFleet(hass)
+    fleet.async_start(entry)
+    await hass.config_entries.async_forward_entry_setups(entry, FLEET_PLATFORMS)
     return True
 
 
@@ -49,7 +87,17 @@ async def _async_update_listener(hass: HomeAssistant, entry: BonecoConfigEntry)
 
 async def async_unload_entry(hass: HomeAssistant, entry: BonecoConfigEntry) -> bool:
     """Unload a config entry."""
-    sensor_type = BonecoDeviceClass(entry.data[CONF_SENSOR_TYPE])
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET:
+        return await hass.config_entries.async_unload_platforms(entry, FLEET_PLATFORMS)
     return await hass.config_entries.async_unload_platforms(
-        entry, PLATFORMS_BY_TYPE[sensor_type]
+        entry, entry.runtime_data.platforms
     )
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: BonecoConfigEntry) -> None:
+    """Remove data stored for a config entry."""
+    from .pending import async_remove_pending_writes
+    from .snapshots import async_remove_snapshots
+
+    await async_remove_pending_writes(hass, entry.entry_id)
+    await async_remove_snapshots(hass, entry.entry_id)
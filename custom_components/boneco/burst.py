@@ -0,0 +1,105 @@
+"""High resolution burst sampling of Boneco measurements."""
+
+from array import array
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+import math
+import time
+from typing import Any
+
+from pyboneco import BonecoDeviceInfo
+
+from .models import MEASUREMENTS, get_measurements
+
+CHANNELS = tuple(MEASUREMENTS)
+
+
+class BonecoSampleBuffer:
+    """Fixed-size ring buffer of measurements stored in typed arrays."""
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the buffer."""
+        self.capacity = capacity
+        self._timestamps = array("d", [0.0]) * capacity
+        self._channels = {
+            channel: array("f", [math.nan]) * capacity for channel in CHANNELS
+        }
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored samples."""
+        return self._size
+
+    def append(self, timestamp: float, info: BonecoDeviceInfo) -> None:
+        """Store a sample, overwriting the oldest one if the buffer is full."""
+        index = self._next
+        self._timestamps[index] = timestamp
+        for channel, value in get_measurements(info).items():
+            self._channels[channel][index] = math.nan if value is None else value
+        self._next = (index + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _ordered(self, values: array) -> list[float]:
+        if self._size < self.capacity:
+            return values[: self._size].tolist()
+        return (values[self._next :] + values[: self._next]).tolist()
+
+    def statistics(self) -> dict[str, dict[str, float | int | None]]:
+        """Return count, min, max and mean of every channel."""
+        result: dict[str, dict[str, float | int | None]] = {}
+        for channel, values in self._channels.items():
+            present = [v for v in self._ordered(values) if not math.isnan(v)]
+            result[channel] = {
+                "count": len(present),
+                "min": min(present, default=None),
+                "max": max(present, default=None),
+                "mean": round(math.fsum(present) / len(present), 2)
+                if present
+                else None,
+            }
+        return result
+
+    def downsample(self, points: int) -> list[dict[str, Any]]:
+        """Return at most the given number of bucket averages, oldest first."""
+        timestamps = self._ordered(self._timestamps)
+        channels = {
+            channel: self._ordered(values) for channel, values in self._channels.items()
+        }
+        bucket = max(math.ceil(len(timestamps) / points), 1)
+        series: list[dict[str, Any]] = []
+        for start in range(0, len(timestamps), bucket):
+            stop = start + bucket
+            point: dict[str, Any] = {
+                "time": datetime.fromtimestamp(timestamps[start], UTC).isoformat()
+            }
+            for channel, values in channels.items():
+                present = [v for v in values[start:stop] if not math.isnan(v)]
+                point[channel] = (
+                    round(math.fsum(present) / len(present), 2) if present else None
+                )
+            series.append(point)
+        return series
+
+
+@dataclass
+class BonecoBurst:
+    """State of a running burst."""
+
+    interval: float
+    ends_at: float
+    buffer: BonecoSampleBuffer
+    started: float = field(default_factory=time.time)
+    errors: int = 0
+
+    def summary(self, points: int) -> dict[str, Any]:
+        """Return the result of the burst."""
+        return {
+            "started": datetime.fromtimestamp(self.started, UTC).isoformat(),
+            "finished": datetime.now(UTC).isoformat(),
+            "interval": self.interval,
+            "samples": len(self.buffer),
+            "errors": self.errors,
+            "statistics": self.buffer.statistics(),
+            "series": self.buffer.downsample(points),
+        }
@@ -0,0 +1,49 @@
+"""Capabilities of a Boneco device derived from its first state."""
+
+from collections.abc import Callable
+
+from homeassistant.const import Platform
+from pyboneco import BonecoDeviceClass
+
+from .const import PLATFORMS_BY_TYPE
+from .models import BonecoCombinedState
+
+
+def get_operating_modes(data: BonecoCombinedState) -> list[str]:
+    """Return operating modes supported by the device."""
+    return [
+        str(k) for k, v in data.info.device.operating_modes.items() if v is not None
+    ]
+
+
+def has_several_operating_modes(data: BonecoCombinedState) -> bool:
+    """Return true if the operating mode can be changed."""
+    return len(get_operating_modes(data)) > 1
+
+
+def has_reminders(data: BonecoCombinedState) -> bool:
+    """Return true if the device keeps any maintenance reminder."""
+    state = data.state
+    return (
+        state.has_reminder_clean_date
+        or state.has_reminder_iss_date
+        or state.has_reminder_filter_date
+    )
+
+
+# Platforms which only create entities for some models of a device class
+OPTIONAL_PLATFORMS: dict[Platform, Callable[[BonecoCombinedState], bool]] = {
+    Platform.BUTTON: has_reminders,
+    Platform.SELECT: has_several_operating_modes,
+}
+
+
+def get_platforms(
+    device_class: BonecoDeviceClass, data: BonecoCombinedState
+) -> list[Platform]:
+    """Return platforms which will create entities for the device."""
+    return [
+        platform
+        for platform in PLATFORMS_BY_TYPE[device_class]
+        if platform not in OPTIONAL_PLATFORMS or OPTIONAL_PLATFORMS[platform](data)
+    ]
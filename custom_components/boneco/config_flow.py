@@ -4,18 +4,33 @@ from __future__ import annotations
 
 import asyncio
 from dataclasses import dataclass
+from functools import lru_cache
 import logging
-from typing import Any
+import time
+from typing import TYPE_CHECKING, Any
 
-from bleak.backends.device import BLEDevice
 import voluptuous as vol
 
 from homeassistant.components import bluetooth
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_ADDRESS, CONF_PASSWORD, CONF_SENSOR_TYPE
-from homeassistant.core import callback
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.data_entry_flow import AbortFlow
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.device_registry import format_mac
+from homeassistant.helpers.selector import (
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
+)
 from pyboneco import (
     SUPPORTED_DEVICE_CLASSES_BY_MODEL,
     BonecoAdvertisingData,
@@ -24,10 +39,36 @@ from pyboneco import (
     BonecoClient,
 )
 
-from .const import DOMAIN, WAIT_FOR_CONFIRM_PAIRING_TIMEOUT, WAIT_FOR_PAIRING_TIMEOUT
+from .const import (
+    BULK_PAIRING_SLOTS,
+    BULK_PAIRING_TIMEOUT,
+    CONF_ENTRY_TYPE,
+    CONF_PIPELINED_READS,
+    CONF_PROFILE,
+    CONF_PROPERTY_ACCOUNTING,
+    CONF_TRACE_SAMPLING,
+    DEFAULT_PIPELINED_READS,
+    DEFAULT_PROFILE,
+    DEFAULT_PROPERTY_ACCOUNTING,
+    DEFAULT_TRACE_SAMPLING,
+    DISCOVERY_CACHE_SIZE,
+    DISCOVERY_TTL,
+    DOMAIN,
+    ENTRY_TYPE_FLEET,
+    TIMEOUT_RANGES,
+    WAIT_FOR_CONFIRM_PAIRING_TIMEOUT,
+    WAIT_FOR_PAIRING_TIMEOUT,
+)
+from .models import PROFILES
+
+if TYPE_CHECKING:
+    from bleak.backends.device import BLEDevice
 
 _LOGGER = logging.getLogger(__name__)
 
+SOURCE_PAIRED = "paired"
+CONF_DEVICES = "devices"
+
 
 def _name_from_discovery(discovery: DiscoveredBoneco) -> str:
     """Get the name from a discovery."""
@@ -40,13 +81,43 @@ def _parse_advertisement_data(
     manufacturer_data: dict[int, bytes],
 ) -> BonecoAdvertisingData | None:
     args = next(iter(manufacturer_data.items()), None)
-    return BonecoAdvertisingData(*args) if args is not None else None
+    return _parse_manufacturer_data(*args) if args is not None else None
+
+
+@lru_cache(maxsize=DISCOVERY_CACHE_SIZE)
+def _parse_manufacturer_data(
+    manufacturer_id: int, data: bytes
+) -> BonecoAdvertisingData:
+    # Devices repeat the same payload, so most advertisements hit the cache
+    return BonecoAdvertisingData(manufacturer_id, data)
+
+
+async def _async_pair(client: BonecoClient, auth_data: BonecoAuth) -> None:
+    """Exchange the key with a device in pairing mode."""
+    confirmed_event = asyncio.Event()
+
+    def on_state_update(auth: BonecoAuth) -> None:
+        _LOGGER.debug(
+            "Got new auth state: current=%s, level=%d",
+            auth.current_state,
+            auth.current_auth_level,
+        )
+        if auth.current_state == BonecoAuthState.CONFIRMED:
+            confirmed_event.set()
+
+    auth_data.set_auth_state_callback(on_state_update)
+    if not client.is_connected:
+        await client.connect()
+    async with asyncio.timeout(WAIT_FOR_CONFIRM_PAIRING_TIMEOUT):
+        await client.authorize()
+        await confirmed_event.wait()
 
 
 @dataclass
 class DiscoveredBoneco:
     device: BLEDevice
     advertisement: BonecoAdvertisingData
+    last_seen: float
 
 
 class BonecoConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -54,11 +125,29 @@ class BonecoConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
     _discovered: DiscoveredBoneco = None
-    _discovered_advs: dict[str, DiscoveredBoneco] = {}
     _auth_data: BonecoAuth = None
     _client: BonecoClient = None
     _pairing_task: asyncio.Task = None
     _confirm_task: asyncio.Task = None
+    _bulk_task: asyncio.Task = None
+
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._discovered_advs: dict[str, DiscoveredBoneco] = {}
+        self._bulk_addresses: list[str] = []
+        self._bulk_results: dict[str, bool] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> BonecoOptionsFlow:
+        """Get the options flow for this handler."""
+        return BonecoOptionsFlow()
+
+    @classmethod
+    @callback
+    def async_supports_options_flow(cls, config_entry: ConfigEntry) -> bool:
+        """Return options flow support for this handler."""
+        return config_entry.data.get(CONF_ENTRY_TYPE) != ENTRY_TYPE_FLEET
 
     async def async_step_bluetooth(
         self, discovery_info: bluetooth.BluetoothServiceInfoBleak
@@ -79,7 +168,9 @@ class BonecoConfigFlow(ConfigFlow, domain=DOMAIN):
             "address": discovery_info.address,
         }
 
-        self._discovered = DiscoveredBoneco(discovery_info.device, parsed_adverisement)
+        self._discovered = DiscoveredBoneco(
+            discovery_info.device, parsed_adverisement, discovery_info.time
+        )
         return await self.async_step_bluetooth_confirm()
 
     async def async_step_bluetooth_confirm(
@@ -196,20 +287,116 @@ class BonecoConfigFlow(ConfigFlow, domain=DOMAIN):
         )
         self._abort_if_unique_id_configured()
 
-        _LOGGER.debug("Creating entry for device %s", title)
-        return self.async_create_entry(
-            title=title,
-            data={
-                CONF_ADDRESS: data["address"],
-                CONF_PASSWORD: data["key"],
-                CONF_SENSOR_TYPE: SUPPORTED_DEVICE_CLASSES_BY_MODEL[title],
-            },
-        )
+        return self._async_create_device_entry(data)
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         """Handle the initial step."""
+        return self.async_show_menu(
+            step_id="user", menu_options=["device", "bulk", "fleet"]
+        )
+
+    async def async_step_bulk(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Pick discovered devices to pair at once."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_DEVICES]:
+                self._bulk_addresses = user_input[CONF_DEVICES]
+                return await self.async_step_bulk_pairing()
+            errors["base"] = "no_devices_selected"
+
+        self._async_discover_devices()
+        return self.async_show_form(
+            step_id="bulk",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_DEVICES, default=list(self._discovered_advs)
+                    ): cv.multi_select(
+                        {
+                            address: _name_from_discovery(parsed)
+                            for address, parsed in self._discovered_advs.items()
+                        }
+                    ),
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_bulk_pairing(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Wait until the selected devices are paired."""
+        if not self._bulk_task:
+            self._bulk_results = {}
+            self._bulk_task = self.hass.async_create_task(
+                self._async_pair_devices(), eager_start=False
+            )
+
+        if not self._bulk_task.done():
+            return self.async_show_progress(
+                step_id="bulk_pairing",
+                progress_action="bulk_pairing",
+                progress_task=self._bulk_task,
+                description_placeholders={"slots": str(BULK_PAIRING_SLOTS)},
+            )
+
+        self._bulk_task = None
+        return self.async_show_progress_done(next_step_id="bulk_done")
+
+    async def async_step_bulk_done(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Report the result of bulk pairing."""
+        # Devices which never entered pairing mode have no result
+        failed = [
+            self._bulk_device_name(address)
+            for address in self._bulk_addresses
+            if not self._bulk_results.get(address)
+        ]
+        return self.async_abort(
+            reason="bulk_pairing_partial" if failed else "bulk_pairing_done",
+            description_placeholders={
+                "paired": str(len(self._bulk_addresses) - len(failed)),
+                "failed": str(len(failed)),
+                "failed_devices": ", ".join(failed),
+            },
+        )
+
+    def _bulk_device_name(self, address: str) -> str:
+        if discovered := self._discovered_advs.get(address):
+            return _name_from_discovery(discovered)
+        return address
+
+    async def async_step_paired(self, data: dict[str, Any]) -> ConfigFlowResult:
+        """Create an entry for a device paired in bulk."""
+        await self.async_set_unique_id(
+            format_mac(data["address"]), raise_on_progress=False
+        )
+        self._abort_if_unique_id_configured()
+        return self._async_create_device_entry(data)
+
+    async def async_step_fleet(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Set up aggregate sensors over all devices."""
+        await self.async_set_unique_id(ENTRY_TYPE_FLEET)
+        self._abort_if_unique_id_configured()
+        if user_input is not None:
+            return self.async_create_entry(
+                title="Boneco fleet", data={CONF_ENTRY_TYPE: ENTRY_TYPE_FLEET}
+            )
+
+        self._set_confirm_only()
+        return self.async_show_form(step_id="fleet")
+
+    async def async_step_device(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Pick a discovered device."""
         errors: dict[str, str] = {}
         if user_input is not None:
             address = user_input[CONF_ADDRESS]
@@ -223,7 +410,7 @@ class BonecoConfigFlow(ConfigFlow, domain=DOMAIN):
         self._async_discover_devices()
 
         return self.async_show_form(
-            step_id="user",
+            step_id="device",
             data_schema=vol.Schema(
                 {
                     vol.Required(CONF_ADDRESS): vol.In(
@@ -237,6 +424,19 @@ class BonecoConfigFlow(ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    @callback
+    def _async_create_device_entry(self, data: dict[str, Any]) -> ConfigFlowResult:
+        title = data["name"]
+        _LOGGER.debug("Creating entry for device %s", title)
+        return self.async_create_entry(
+            title=title,
+            data={
+                CONF_ADDRESS: data["address"],
+                CONF_PASSWORD: data["key"],
+                CONF_SENSOR_TYPE: SUPPORTED_DEVICE_CLASSES_BY_MODEL[title],
+            },
+        )
+
     async def _async_choose_next_step(self) -> ConfigFlowResult:
         self._auth_data = BonecoAuth(self._discovered.device)
         self._client = BonecoClient(self._auth_data)
@@ -270,24 +470,91 @@ class BonecoConfigFlow(ConfigFlow, domain=DOMAIN):
 
     async def _async_authorize(self) -> None:
         assert self._client
-
-        confirmed_event = asyncio.Event()
-
-        def on_state_update(auth: BonecoAuth) -> None:
-            _LOGGER.debug(
-                "Got new auth state: current=%s, level=%d",
-                auth.current_state,
-                auth.current_auth_level,
+        await _async_pair(self._client, self._auth_data)
+
+    async def _async_pair_devices(self) -> None:
+        """Pair every selected device as soon as it enters pairing mode."""
+        semaphore = asyncio.Semaphore(BULK_PAIRING_SLOTS)
+        pending = set(self._bulk_addresses)
+        finished = asyncio.Event()
+        tasks: set[asyncio.Task] = set()
+        unsubs: list[CALLBACK_TYPE] = []
+
+        async def pair(device: BLEDevice) -> None:
+            async with semaphore:
+                auth_data = BonecoAuth(device)
+                # pyboneco shares one auth event between all devices
+                auth_data._state_changed = asyncio.Event()
+                client = BonecoClient(auth_data)
+                try:
+                    await _async_pair(client, auth_data)
+                except Exception as err:
+                    _LOGGER.debug("Can't pair %s: %s", device.address, err)
+                    self._bulk_results[device.address] = False
+                else:
+                    data = auth_data.save()
+                    # Confirmed on the device, but the key exchange failed
+                    paired = bool(data["key"]) and (
+                        auth_data.current_state == BonecoAuthState.AUTH_SUCCESS
+                    )
+                    if not paired:
+                        _LOGGER.debug("Key not found for device %s", device.address)
+                    self._bulk_results[device.address] = paired
+                    if paired:
+                        await self.hass.config_entries.flow.async_init(
+                            DOMAIN, context={"source": SOURCE_PAIRED}, data=data
+                        )
+                finally:
+                    await client.disconnect()
+            self.async_update_progress(
+                len(self._bulk_results) / len(self._bulk_addresses)
             )
-            if auth.current_state == BonecoAuthState.CONFIRMED:
-                confirmed_event.set()
-
-        self._auth_data.set_auth_state_callback(on_state_update)
-        if not self._client.is_connected:
-            await self._client.connect()
-        async with asyncio.timeout(WAIT_FOR_CONFIRM_PAIRING_TIMEOUT):
-            await self._client.authorize()
-            await confirmed_event.wait()
+            if len(self._bulk_results) == len(self._bulk_addresses):
+                finished.set()
+
+        @callback
+        def handle_advertisement(
+            service_info: bluetooth.BluetoothServiceInfoBleak,
+            change: bluetooth.BluetoothChange,
+        ) -> None:
+            adv_data = _parse_advertisement_data(service_info.manufacturer_data)
+            if (
+                service_info.address not in pending
+                or adv_data is None
+                or not adv_data.is_boneco_device
+                or not adv_data.pairing_active
+            ):
+                return
+            pending.discard(service_info.address)
+            task = self.hass.async_create_task(pair(service_info.device))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        for address in self._bulk_addresses:
+            unsubs.append(
+                bluetooth.async_register_callback(
+                    self.hass,
+                    handle_advertisement,
+                    bluetooth.BluetoothCallbackMatcher(address=address),
+                    bluetooth.BluetoothScanningMode.ACTIVE,
+                )
+            )
+            if service_info := bluetooth.async_last_service_info(
+                self.hass, address, connectable=True
+            ):
+                handle_advertisement(
+                    service_info, bluetooth.BluetoothChange.ADVERTISEMENT
+                )
+        try:
+            async with asyncio.timeout(BULK_PAIRING_TIMEOUT):
+                await finished.wait()
+        except TimeoutError:
+            _LOGGER.debug("Bulk pairing timed out, %s devices left", len(pending))
+        finally:
+            for unsub in unsubs:
+                unsub()
+            for task in tasks:
+                task.cancel()
 
     @callback
     def _async_discover_devices(self) -> None:
@@ -296,10 +563,7 @@ class BonecoConfigFlow(ConfigFlow, domain=DOMAIN):
             self.hass, connectable=True
         ):
             address = discovery_info.address
-            if (
-                format_mac(address) in current_addresses
-                or address in self._discovered_advs
-            ):
+            if format_mac(address) in current_addresses:
                 continue
 
             parsed_adverisement = _parse_advertisement_data(
@@ -309,8 +573,87 @@ class BonecoConfigFlow(ConfigFlow, domain=DOMAIN):
                 continue
 
             self._discovered_advs[address] = DiscoveredBoneco(
-                discovery_info.device, parsed_adverisement
+                discovery_info.device, parsed_adverisement, discovery_info.time
             )
 
+        # Devices which stopped advertising are not offered anymore
+        now = time.monotonic()
+        self._discovered_advs = {
+            address: discovered
+            for address, discovered in self._discovered_advs.items()
+            if now - discovered.last_seen < DISCOVERY_TTL
+            and format_mac(address) not in current_addresses
+        }
         if not self._discovered_advs:
             raise AbortFlow("no_devices_found")
+
+
+class BonecoOptionsFlow(OptionsFlow):
+    """Handle performance options of a Boneco device."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Pick the performance profile and instrumentation."""
+        if user_input is not None:
+            # Keep options which aren't part of the form, timeouts left empty
+            # fall back to those of the profile
+            options = {
+                key: value
+                for key, value in self.config_entry.options.items()
+                if key not in TIMEOUT_RANGES
+            }
+            return self.async_create_entry(data={**options, **user_input})
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_PROFILE,
+                        default=options.get(CONF_PROFILE, DEFAULT_PROFILE),
+                    ): SelectSelector(
+                        SelectSelectorConfig(
+                            options=list(PROFILES),
+                            mode=SelectSelectorMode.LIST,
+                            translation_key=CONF_PROFILE,
+                        )
+                    ),
+                    **{
+                        vol.Optional(
+                            key, description={"suggested_value": options.get(key)}
+                        ): vol.All(
+                            vol.Coerce(float), vol.Range(min=minimum, max=maximum)
+                        )
+                        for key, (minimum, maximum) in TIMEOUT_RANGES.items()
+                    },
+                    vol.Required(
+                        CONF_PIPELINED_READS,
+                        default=options.get(
+                            CONF_PIPELINED_READS, DEFAULT_PIPELINED_READS
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_TRACE_SAMPLING,
+                        default=options.get(
+                            CONF_TRACE_SAMPLING, DEFAULT_TRACE_SAMPLING
+                        ),
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=0,
+                            max=100,
+                            step=1,
+                            unit_of_measurement="%",
+                            mode=NumberSelectorMode.SLIDER,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_PROPERTY_ACCOUNTING,
+                        default=options.get(
+                            CONF_PROPERTY_ACCOUNTING, DEFAULT_PROPERTY_ACCOUNTING
+                        ),
+                    ): bool,
+                }
+            ),
+        )
@@ -1,8 +1,15 @@
 """Constants for the Boneco integration."""
 
+from homeassistant.components.humidifier import (
+    MODE_AUTO,
+    MODE_BABY,
+    MODE_NORMAL,
+    MODE_SLEEP,
+)
 from homeassistant.const import Platform
 from pyboneco import (
     BonecoDeviceClass,
+    BonecoModeStatus,
     AIR_FAN_DEVICE_FAN_MAX_VALUE,
     OTHER_DEVICE_FAN_MAX_VALUE,
 )
@@ -11,8 +18,68 @@ DOMAIN = "boneco"
 MANUFACTURER = "Boneco"
 WAIT_FOR_PAIRING_TIMEOUT = 30
 WAIT_FOR_CONFIRM_PAIRING_TIMEOUT = 30
-UPDATE_INTERVAL = 60
-UPDATE_TIMEOUT = 30
+DISCOVERY_TTL = 5 * 60
+BULK_PAIRING_SLOTS = 3
+BULK_PAIRING_TIMEOUT = 10 * 60
+DISCOVERY_CACHE_SIZE = 256
+CONF_PROFILE = "profile"
+PROFILE_ECO = "eco"
+PROFILE_BALANCED = "balanced"
+PROFILE_RESPONSIVE = "responsive"
+DEFAULT_PROFILE = PROFILE_BALANCED
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_AUTH_TIMEOUT = "auth_timeout"
+CONF_READ_TIMEOUT = "read_timeout"
+CONF_WRITE_TIMEOUT = "write_timeout"
+CONF_PIPELINED_READS = "pipelined_reads"
+CONF_TRACE_SAMPLING = "trace_sampling"
+CONF_PROPERTY_ACCOUNTING = "property_accounting"
+DEFAULT_CONNECT_TIMEOUT = 20
+DEFAULT_AUTH_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 5
+DEFAULT_WRITE_TIMEOUT = 5
+# Bounds in seconds of timeouts overriding those of the profile
+TIMEOUT_RANGES = {
+    CONF_CONNECT_TIMEOUT: (5, 120),
+    CONF_AUTH_TIMEOUT: (2, 60),
+    CONF_READ_TIMEOUT: (1, 60),
+    CONF_WRITE_TIMEOUT: (1, 60),
+}
+DEFAULT_PIPELINED_READS = False
+DEFAULT_TRACE_SAMPLING = 0
+DEFAULT_PROPERTY_ACCOUNTING = False
+TRACE_MAX_BYTES = 10 * 1024 * 1024
+TRACE_BACKUP_COUNT = 5
+LATENCY_WINDOW = 100
+# Upper bounds in seconds of the latency histograms served to scrapers
+METRICS_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+DEFAULT_MAX_PARALLEL = 3
+PENDING_WRITES_TTL = 6 * 60 * 60
+PENDING_WRITES_SAVE_DELAY = 1
+SNAPSHOTS_SAVE_DELAY = 1
+DEFAULT_SNAPSHOT = "default"
+DEFAULT_BURST_INTERVAL = 5
+BURST_MAX_SAMPLES = 3600
+BURST_SERIES_POINTS = 60
+EVENT_BURST_FINISHED = f"{DOMAIN}_burst_finished"
+EVENT_TRAFFIC_RECORDED = f"{DOMAIN}_traffic_recorded"
+EVENT_PROFILE_CAPTURED = f"{DOMAIN}_profile_captured"
+PROFILE_MAX_DURATION = 60 * 60
+MIN_MEASUREMENT_INTERVAL = 1
+SIGNAL_DEVICE_UPDATED = f"{DOMAIN}_device_updated"
+CONF_ENTRY_TYPE = "entry_type"
+ENTRY_TYPE_FLEET = "fleet"
+FLEET_PLATFORMS = [Platform.SENSOR]
+RSSI_SMOOTHING_WINDOW = 10
+RSSI_UPDATE_INTERVAL = 10
+LINK_HISTORY_SIZE = 50
+LINK_GOOD_PROBABILITY = 0.7
+# Share of the update interval a poll may wait for a better link
+LINK_POLL_TOLERANCE = 0.5
+LINK_MAX_SKIPPED_POLLS = 3
+# Seconds between retries of failed writes on advertisements, doubled per failure
+WRITE_RETRY_MIN_DELAY = 5
+WRITE_RETRY_MAX_DELAY = 300
 AIR_FAN_SPEED_RANGE = (1, AIR_FAN_DEVICE_FAN_MAX_VALUE)
 OTHER_FAN_SPEED_RANGE = (1, OTHER_DEVICE_FAN_MAX_VALUE)
 DEVICES_WITH_FILTER = [BonecoDeviceClass.SIMPLE_CLIMATE, BonecoDeviceClass.TOP_CLIMATE]
@@ -20,6 +87,16 @@ DEVICE_CLEAN_PERIOD = 14
 ISS_REPLACE_PERIOD = 365
 FILTER_REPLACE_PERIOD = 365
 
+BONECO_MODE_MAPPING: dict[BonecoModeStatus, str] = {
+    BonecoModeStatus.CUSTOM: MODE_NORMAL,
+    BonecoModeStatus.AUTO: MODE_AUTO,
+    BonecoModeStatus.BABY: MODE_BABY,
+    BonecoModeStatus.SLEEP: MODE_SLEEP,
+}
+BONECO_MODE_REVERSE_MAPPING: dict[str, BonecoModeStatus] = {
+    ha_mode: boneco_mode for boneco_mode, ha_mode in BONECO_MODE_MAPPING.items()
+}
+
 PLATFORMS_BY_TYPE = {
     BonecoDeviceClass.FAN: [
         Platform.BINARY_SENSOR,
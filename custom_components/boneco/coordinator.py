@@ -1,37 +1,98 @@
 """Provides Boneco DataUpdateCoordinator."""
 
 import asyncio
-from collections.abc import Callable
-from datetime import timedelta
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+import copy
+from datetime import datetime, timedelta
 import logging
+import math
+from pathlib import Path
+import time
+from typing import Any
 
 from bleak_retry_connector import close_stale_connections_by_address
 
+from homeassistant.components import bluetooth
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.debounce import Debouncer
-from homeassistant.helpers.update_coordinator import (
-    DataUpdateCoordinator,
-    UpdateFailed,
-    REQUEST_REFRESH_DEFAULT_COOLDOWN,
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from pyboneco import (
+    BonecoAuth,
+    BonecoAuthState,
+    BonecoClient,
+    BonecoDeviceClass,
+    BonecoDeviceInfo,
+    BonecoDeviceState,
 )
-from pyboneco import BonecoAuth, BonecoClient, BonecoDeviceClass, BonecoDeviceState
 
-from .const import DOMAIN, MANUFACTURER, UPDATE_INTERVAL, UPDATE_TIMEOUT
-from .models import BonecoCombinedState
+from .burst import BonecoBurst, BonecoSampleBuffer
+from .const import (
+    BURST_SERIES_POINTS,
+    CONF_PIPELINED_READS,
+    CONF_PROPERTY_ACCOUNTING,
+    CONF_TRACE_SAMPLING,
+    DEFAULT_PIPELINED_READS,
+    DEFAULT_PROPERTY_ACCOUNTING,
+    DEFAULT_TRACE_SAMPLING,
+    DOMAIN,
+    EVENT_BURST_FINISHED,
+    EVENT_TRAFFIC_RECORDED,
+    LINK_MAX_SKIPPED_POLLS,
+    LINK_POLL_TOLERANCE,
+    MANUFACTURER,
+    SIGNAL_DEVICE_UPDATED,
+    WRITE_RETRY_MAX_DELAY,
+    WRITE_RETRY_MIN_DELAY,
+)
+from .link import BonecoLinkQuality
+from .metrics import BonecoDeviceMetrics, BonecoLatencyStats, BonecoPropertyStats
+from .models import (
+    BonecoCombinedState,
+    BonecoProfile,
+    get_state_fields,
+    set_state_fields,
+)
+from .pending import BonecoPendingWrites
+from .scheduler import (
+    BonecoOperation,
+    BonecoOperationPreempted,
+    BonecoOperationPriority,
+    BonecoOperationScheduler,
+)
+from .snapshots import BonecoSnapshots
+from .tracing import BonecoTracer, async_get_trace_writer
+from .traffic import BonecoRecordingClient, BonecoTrafficRecorder
 
 _LOGGER = logging.getLogger(__name__)
 
 type BonecoConfigEntry = ConfigEntry[BonecoDataUpdateCoordinator]
+type BonecoMeasurementListener = Callable[[float, BonecoDeviceInfo], None]
 
 
 class BonecoDataUpdateCoordinator(DataUpdateCoordinator[BonecoCombinedState]):
     """Boneco device update coordinator."""
 
-    _lock: asyncio.Lock = asyncio.Lock()
     _pending_state: BonecoDeviceState = None
+    _pending_generation: int = 0
+    _write_failed: bool = False
+    _write_retry_delay: float = WRITE_RETRY_MIN_DELAY
+    _next_write_retry: float = 0
+    _burst: BonecoBurst | None = None
+    _recorder: BonecoTrafficRecorder | None = None
+    _unsub_idle_disconnect: CALLBACK_TYPE | None = None
+    _good_link: asyncio.Future[None] | None = None
+    _poll_operation: BonecoOperation | None = None
+    _skipped_polls: int = 0
     device_info: dr.DeviceInfo = None
+    platforms: list[Platform]
+    last_burst: dict[str, Any] | None = None
 
     def __init__(
         self,
@@ -39,24 +100,55 @@ class BonecoDataUpdateCoordinator(DataUpdateCoordinator[BonecoCombinedState]):
         config_entry: BonecoConfigEntry,
         boneco_auth: BonecoAuth,
         device_class: BonecoDeviceClass,
+        client: BonecoClient | None = None,
     ) -> None:
-        """Initialize the coordinator."""
+        """Initialize the coordinator.
+
+        A client can be passed to talk to something else than the device,
+        e.g. to replay recorded traffic.
+        """
+        self.profile = BonecoProfile.from_options(config_entry.options)
         super().__init__(
             hass,
             logger=_LOGGER,
             config_entry=config_entry,
             name=DOMAIN,
-            update_interval=timedelta(seconds=UPDATE_INTERVAL),
+            update_interval=timedelta(seconds=self.profile.update_interval),
             update_method=self._async_fetch_state,
             always_update=True,
         )
         self.auth_data = boneco_auth
+        # pyboneco shares one auth event between all devices, so give every
+        # device its own to let them authorize concurrently
+        self.auth_data._state_changed = asyncio.Event()
         self.device_class = device_class
-        self._client = BonecoClient(self.auth_data)
+        self.command_latency = BonecoLatencyStats()
+        self.poll_duration = BonecoLatencyStats()
+        self.metrics = BonecoDeviceMetrics()
+        self.pipelined_reads: bool = config_entry.options.get(
+            CONF_PIPELINED_READS, DEFAULT_PIPELINED_READS
+        )
+        self.timeouts = self.profile.timeouts
+        self.timeout_counts: Counter[str] = Counter()
+        self.tracer = BonecoTracer(boneco_auth.address)
+        self.property_stats = (
+            BonecoPropertyStats()
+            if config_entry.options.get(
+                CONF_PROPERTY_ACCOUNTING, DEFAULT_PROPERTY_ACCOUNTING
+            )
+            else None
+        )
+        self._client = client or BonecoClient(self.auth_data)
+        self._scheduler = BonecoOperationScheduler()
+        self._measurement_listeners: list[BonecoMeasurementListener] = []
+        self.link = BonecoLinkQuality()
+        self._link_listeners: list[CALLBACK_TYPE] = []
+        self._pending_writes = BonecoPendingWrites(hass, config_entry.entry_id)
+        self.snapshots = BonecoSnapshots(hass, config_entry.entry_id)
         self._debounced_write: Debouncer = Debouncer(
             hass,
             logger=_LOGGER,
-            cooldown=REQUEST_REFRESH_DEFAULT_COOLDOWN,
+            cooldown=self.profile.write_cooldown,
             immediate=False,
             function=self._async_set_state,
             background=True,
@@ -64,12 +156,14 @@ class BonecoDataUpdateCoordinator(DataUpdateCoordinator[BonecoCombinedState]):
 
     async def set_state(self, new_state: BonecoDeviceState) -> None:
         """Overwrite state for the device."""
-        _LOGGER.debug(
-            "Saving a new state %s instead of %s",
-            vars(new_state),
-            vars(self._last_state()),
-        )
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Saving a new state %s instead of %s",
+                vars(new_state),
+                vars(self._last_state()),
+            )
         self._pending_state = new_state
+        self._pending_generation += 1
         self._debounced_write.async_schedule_call()
 
     async def update_state(
@@ -78,11 +172,148 @@ class BonecoDataUpdateCoordinator(DataUpdateCoordinator[BonecoCombinedState]):
         """Update state for the device"""
         _LOGGER.debug("Updating state")
         new_state = self._last_state()
+        before = get_state_fields(new_state)
         update_fn(new_state)
+        self._pending_writes.record(before, get_state_fields(new_state))
         await self.set_state(new_state)
 
+    async def async_apply_state(
+        self, update_fn: Callable[[BonecoDeviceState], None]
+    ) -> None:
+        """Apply several changes to the device state with a single write.
+
+        Changes which are waiting for the debounced write are sent as well.
+        """
+        new_state = copy.copy(self._last_state())
+        update_fn(new_state)
+        self._debounced_write.async_cancel()
+        try:
+            await self._async_write_state(new_state)
+        except Exception:
+            if self._pending_state is not None:
+                self._debounced_write.async_schedule_call()
+            raise
+
+    @callback
+    def async_save_snapshot(self, name: str) -> None:
+        """Save the current state, including changes not written yet."""
+        self.snapshots.save(name, self._last_state())
+
+    async def async_restore_snapshot(self, name: str) -> list[str]:
+        """Restore a saved state with a single write.
+
+        Fields which already have the saved value are skipped, nothing is
+        written if all of them do. Returns the names of restored fields.
+        """
+        fields = self.snapshots.get(name)
+        if not set_state_fields(copy.copy(self._last_state()), fields):
+            self.metrics.skipped_writes += 1
+            return []
+        restored: list[str] = []
+        await self.async_apply_state(
+            lambda state: restored.extend(set_state_fields(state, fields))
+        )
+        return restored
+
+    @callback
+    def async_add_measurement_listener(
+        self, listener: BonecoMeasurementListener
+    ) -> CALLBACK_TYPE:
+        """Listen for every measurement read from the device.
+
+        Listeners get polled and burst samples alike, without going through
+        the state machine.
+        """
+        self._measurement_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._measurement_listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _async_publish_measurements(self, info: BonecoDeviceInfo) -> None:
+        timestamp = time.time()
+        for listener in list(self._measurement_listeners):
+            listener(timestamp, info)
+
+    @callback
+    def async_add_link_listener(self, listener: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for changes of the link quality."""
+        self._link_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._link_listeners.remove(listener)
+
+        return remove_listener
+
+    @property
+    def burst_active(self) -> bool:
+        """Return true if burst sampling is running."""
+        return self._burst is not None
+
+    @callback
+    def async_start_burst(self, duration: timedelta, interval: float) -> None:
+        """Sample measurements every interval seconds for the given duration.
+
+        The connection is kept open during the burst and samples go to a ring
+        buffer instead of the state machine. A summary is fired as an event
+        when the burst ends. The buffer holds every sample of the burst, so
+        callers limit it to BURST_MAX_SAMPLES.
+        """
+        assert self._burst is None
+        seconds = duration.total_seconds()
+        self._burst = BonecoBurst(
+            interval=interval,
+            ends_at=time.monotonic() + seconds,
+            buffer=BonecoSampleBuffer(max(math.ceil(seconds / interval), 1)),
+        )
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_run_burst(self._burst),
+            f"{DOMAIN} burst {self.auth_data.address}",
+        )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        if self.property_stats is not None:
+            self.property_stats.updates += 1
+        super().async_update_listeners()
+        async_dispatcher_send(
+            self.hass, SIGNAL_DEVICE_UPDATED, self.config_entry.entry_id, self
+        )
+
+    @property
+    def recording_traffic(self) -> bool:
+        """Return true if device traffic is being recorded."""
+        return self._recorder is not None
+
+    @callback
+    def async_start_recording(self, duration: timedelta) -> None:
+        """Record all device requests with their timings for the duration."""
+        assert self._recorder is None
+        self._recorder = BonecoTrafficRecorder(self.auth_data)
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_record_traffic(self._recorder, duration),
+            f"{DOMAIN} traffic recording {self.auth_data.address}",
+        )
+
     async def async_shutdown(self) -> None:
         self._debounced_write.async_shutdown()
+        if self._burst is not None:
+            # Ends after the current sample, the task is cancelled on unload
+            self._burst.ends_at = 0
+        if self._unsub_idle_disconnect is not None:
+            self._unsub_idle_disconnect()
+            self._unsub_idle_disconnect = None
+        if self._client.is_connected:
+            await self._client.disconnect()
+        async_dispatcher_send(
+            self.hass, SIGNAL_DEVICE_UPDATED, self.config_entry.entry_id, None
+        )
         await super().async_shutdown()
 
     def _last_state(self) -> BonecoDeviceState:
@@ -91,51 +322,424 @@ class BonecoDataUpdateCoordinator(DataUpdateCoordinator[BonecoCombinedState]):
     async def _async_setup(self):
         address = self.auth_data.address
         await close_stale_connections_by_address(address)
+        await self._pending_writes.async_load()
+        await self.snapshots.async_load()
+        if service_info := bluetooth.async_last_service_info(self.hass, address):
+            self.link.add_rssi(service_info.rssi)
+        if sampling := self.config_entry.options.get(
+            CONF_TRACE_SAMPLING, DEFAULT_TRACE_SAMPLING
+        ):
+            self.tracer = BonecoTracer(
+                address, await async_get_trace_writer(self.hass), sampling / 100
+            )
+        self.config_entry.async_on_unload(
+            bluetooth.async_register_callback(
+                self.hass,
+                self._async_handle_advertisement,
+                bluetooth.BluetoothCallbackMatcher(address=address, connectable=False),
+                bluetooth.BluetoothScanningMode.PASSIVE,
+            )
+        )
 
-    async def _async_set_state(self):
+    @callback
+    def _async_handle_advertisement(
+        self,
+        service_info: bluetooth.BluetoothServiceInfoBleak,
+        change: bluetooth.BluetoothChange,
+    ) -> None:
+        """Track the link and retry failed writes once the device is in reach.
+
+        Retries back off exponentially while they keep failing.
+        """
+        self.link.add_rssi(service_info.rssi)
+        for listener in list(self._link_listeners):
+            listener()
+        if (
+            self._good_link is not None
+            and not self._good_link.done()
+            and self.link.is_good
+        ):
+            self._good_link.set_result(None)
+        if (
+            service_info.connectable
+            and self._write_failed
+            and (self._pending_state or self._pending_writes)
+            and time.monotonic() >= self._next_write_retry
+        ):
+            _LOGGER.debug("Device is advertising, retrying pending writes")
+            # Further advertisements wait for the result of this retry
+            self._next_write_retry = time.monotonic() + self._write_retry_delay
+            self._debounced_write.async_schedule_call()
+
+    async def _async_wait_for_link(self) -> bool:
+        """Wait within the tolerance for a link which likely connects.
+
+        Returns false if the poll should be skipped. Polls are only skipped a
+        few times in a row, so data doesn't get too old.
+        """
+        if (
+            self.link.is_good
+            or self._client.is_connected
+            or self._skipped_polls >= LINK_MAX_SKIPPED_POLLS
+        ):
+            return True
+        self.link.deferred_polls += 1
+        self._good_link = self.hass.loop.create_future()
         try:
-            _LOGGER.debug("Sending new state = %s", vars(self._pending_state))
-            async with self._lock:
-                await self._client.connect()
-                await self._client.set_state(self._pending_state)
+            async with asyncio.timeout(
+                self.profile.update_interval * LINK_POLL_TOLERANCE
+            ):
+                await self._good_link
+        except TimeoutError:
+            self.link.skipped_polls += 1
+            self._skipped_polls += 1
+            return False
+        finally:
+            self._good_link = None
+        return True
+
+    async def _async_disconnect_if_idle(self, operation: BonecoOperation) -> None:
+        """Disconnect unless another operation can reuse the connection."""
+        if not operation.holds_device or self._burst is not None:
+            return
+        has_waiters = self._scheduler.has_waiters()
+        _LOGGER.debug("Another operation is waiting = %s", has_waiters)
+        if has_waiters:
+            return
+        if self.profile.keep_connected:
+            self._async_schedule_idle_disconnect()
+        else:
+            await self._client.disconnect()
+
+    @callback
+    def _async_schedule_idle_disconnect(self) -> None:
+        """Keep the connection open for a while to reuse it."""
+        if self._unsub_idle_disconnect is not None:
+            self._unsub_idle_disconnect()
+        self._unsub_idle_disconnect = async_call_later(
+            self.hass, self.profile.keep_connected, self._async_idle_disconnect
+        )
+
+    async def _async_idle_disconnect(self, _now: datetime) -> None:
+        self._unsub_idle_disconnect = None
+        try:
+            async with self._scheduler.acquire(BonecoOperationPriority.POLL):
+                # Operations which ran meanwhile have rescheduled the disconnect
+                if self._unsub_idle_disconnect is None and self._burst is None:
+                    await self._client.disconnect()
+        except BonecoOperationPreempted:
+            _LOGGER.debug("Idle disconnect was preempted by a command")
+
+    @asynccontextmanager
+    async def _async_acquire(
+        self, priority: BonecoOperationPriority
+    ) -> AsyncIterator[BonecoOperation]:
+        """Hold the device, recording how long the operation waited for it."""
+        started = time.monotonic()
+        async with self._scheduler.acquire(priority) as operation:
+            self.metrics.lock_wait[priority.name.lower()].add(
+                time.monotonic() - started
+            )
+            yield operation
+
+    async def _async_run_step[T](
+        self, step: str, timeout: float, awaitable: Awaitable[T], **attrs: Any
+    ) -> T:
+        """Run a single device request, tearing the connection down on timeout."""
+        try:
+            with self.tracer.span(step, **attrs):
+                async with asyncio.timeout(timeout):
+                    return await awaitable
+        except TimeoutError:
+            self.timeout_counts[step] += 1
+            _LOGGER.debug("Step '%s' took longer than %s seconds", step, timeout)
+            await self._client.disconnect()
+            raise
+
+    async def _async_connect(self) -> None:
+        """Connect and authorize, each within its own deadline."""
+        if not self._client.is_connected:
+            # A retained connection may have been dropped by the device
+            self.auth_data.reset_state()
+            started = time.monotonic()
+            try:
+                await self._async_run_step(
+                    "connect", self.timeouts.connect, self._client.connect()
+                )
+            except Exception:
+                self.link.add_connect_result(False)
+                raise
+            self.link.add_connect_result(True)
+            self.metrics.connect_latency.add(time.monotonic() - started)
+        if self.auth_data.current_state != BonecoAuthState.AUTH_SUCCESS:
+            await self._async_run_step(
+                "auth", self.timeouts.auth, self._client.authorize()
+            )
+            if self.auth_data.current_state != BonecoAuthState.AUTH_SUCCESS:
+                raise UpdateFailed("Device authorization failed")
+
+    async def _async_read[T](self, characteristic: str, awaitable: Awaitable[T]) -> T:
+        return await self._async_run_step(
+            "read", self.timeouts.read, awaitable, characteristic=characteristic
+        )
+
+    async def _async_write_state(self, state: BonecoDeviceState) -> None:
+        # Queued polls are dropped, a refresh is requested after the write
+        self._scheduler.preempt(BonecoOperationPriority.POLL)
+        generation = self._pending_generation
+        started = time.monotonic()
+        with self.tracer.trace("command"):
+            async with self._async_acquire(
+                BonecoOperationPriority.COMMAND
+            ) as operation:
+                try:
+                    await self._async_connect()
+                    write_started = time.monotonic()
+                    await self._async_run_step(
+                        "write", self.timeouts.write, self._client.set_state(state)
+                    )
+                    self.metrics.write_latency.add(time.monotonic() - write_started)
+                except Exception:
+                    self.metrics.write_failures += 1
+                    raise
+                finally:
+                    await self._async_disconnect_if_idle(operation)
+        self.command_latency.add(time.monotonic() - started)
+        self._write_failed = False
+        self._write_retry_delay = WRITE_RETRY_MIN_DELAY
+        self._next_write_retry = 0
+        if generation == self._pending_generation:
             self._pending_state = None
-            self._debounced_refresh.async_schedule_call()
+            self._pending_writes.clear()
+        self._debounced_refresh.async_schedule_call()
+
+    async def _async_set_state(self):
+        if self._pending_state is None:
+            # Changes restored after restart are merged into a fresh state
+            if self._pending_writes:
+                await self.async_request_refresh()
+            return
+        if self._write_failed:
+            self.metrics.retries += 1
+        try:
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("Sending new state = %s", vars(self._pending_state))
+            await self._async_write_state(self._pending_state)
         except Exception as e:
+            # Retried on the next advertisement instead of reconnecting blindly
             _LOGGER.warning("Can't update device state. %s", e, exc_info=True)
+            self._write_failed = True
+            # Retries back off while the device keeps failing
+            self._next_write_retry = time.monotonic() + self._write_retry_delay
+            self._write_retry_delay = min(
+                self._write_retry_delay * 2, WRITE_RETRY_MAX_DELAY
+            )
+
+    def _rebase_pending_writes(self, state: BonecoDeviceState) -> None:
+        """Replay queued changes on top of a freshly read state."""
+        if not self._pending_writes or not (
+            self._write_failed or self._pending_state is None
+        ):
+            return
+        new_state = copy.copy(state)
+        if self._pending_writes.apply(new_state):
+            self._pending_state = new_state
+            self._pending_generation += 1
             self._debounced_write.async_schedule_call()
+        else:
+            self._pending_state = None
+
+    async def _async_run_burst(self, burst: BonecoBurst) -> None:
+        try:
+            while time.monotonic() < burst.ends_at:
+                try:
+                    async with self._async_acquire(BonecoOperationPriority.POLL):
+                        await self._async_connect()
+                        info = await self._async_read(
+                            "info", self._client.get_device_info()
+                        )
+                    burst.buffer.append(time.time(), info)
+                    self._async_publish_measurements(info)
+                except BonecoOperationPreempted:
+                    # A command got the device first, this sample is left out
+                    _LOGGER.debug("Burst sample was preempted by a command")
+                except Exception as err:
+                    _LOGGER.debug("Can't read burst sample: %s", err)
+                    burst.errors += 1
+                await asyncio.sleep(burst.interval)
+        finally:
+            self._burst = None
+            self.last_burst = burst.summary(BURST_SERIES_POINTS)
+            self.hass.bus.async_fire(
+                EVENT_BURST_FINISHED,
+                {
+                    "config_entry_id": self.config_entry.entry_id,
+                    "address": self.auth_data.address,
+                    **self.last_burst,
+                },
+            )
+            # Also when the burst is cancelled, e.g. on unload
+            await asyncio.shield(self._async_disconnect_after_burst())
+
+    async def _async_disconnect_after_burst(self) -> None:
+        try:
+            async with self._scheduler.acquire(
+                BonecoOperationPriority.POLL
+            ) as operation:
+                await self._async_disconnect_if_idle(operation)
+        except BonecoOperationPreempted:
+            # The command disconnects once it's done
+            _LOGGER.debug("Disconnect after burst was preempted by a command")
+
+    async def _async_record_traffic(
+        self, recorder: BonecoTrafficRecorder, duration: timedelta
+    ) -> None:
+        client = self._client
+        try:
+            await self._async_replace_client(
+                BonecoRecordingClient(self.auth_data, recorder)
+            )
+            await asyncio.sleep(duration.total_seconds())
+        finally:
+            await self._async_replace_client(client)
+            self._recorder = None
+
+        path = Path(
+            self.hass.config.path(
+                DOMAIN,
+                "traffic",
+                f"{self.auth_data.address.replace(':', '')}_"
+                f"{int(recorder.header['started'])}.jsonl.gz",
+            )
+        )
+        await self.hass.async_add_executor_job(recorder.save, path)
+        _LOGGER.info("Saved %s device requests to %s", len(recorder.events), path)
+        self.hass.bus.async_fire(
+            EVENT_TRAFFIC_RECORDED,
+            {
+                "config_entry_id": self.config_entry.entry_id,
+                "address": self.auth_data.address,
+                "path": str(path),
+                "events": len(recorder.events),
+            },
+        )
+
+    async def _async_replace_client(self, client: BonecoClient) -> None:
+        """Switch to another client once the device is idle."""
+        async with self._scheduler.acquire(BonecoOperationPriority.COMMAND):
+            await self._client.disconnect()
+            self._client = client
+
+    async def _async_read_device(
+        self, operation: BonecoOperation
+    ) -> tuple[str, BonecoDeviceInfo, BonecoDeviceState]:
+        """Read name, info and state while the operation holds the device."""
+        started = time.monotonic()
+        try:
+            await self._async_connect()
+            if self.pipelined_reads:
+                await operation.async_yield()
+                # Reads are independent, so they share the round trips. A
+                # failed read cancels the others before the disconnect
+                try:
+                    async with asyncio.TaskGroup() as group:
+                        name_read = group.create_task(
+                            self._async_read("name", self._client.get_device_name())
+                        )
+                        info_read = group.create_task(
+                            self._async_read("info", self._client.get_device_info())
+                        )
+                        state_read = group.create_task(
+                            self._async_read("state", self._client.get_state())
+                        )
+                except ExceptionGroup as err:
+                    raise err.exceptions[0] from None
+                result = name_read.result(), info_read.result(), state_read.result()
+            else:
+                await operation.async_yield()
+                name = await self._async_read("name", self._client.get_device_name())
+                await operation.async_yield()
+                info = await self._async_read("info", self._client.get_device_info())
+                await operation.async_yield()
+                state = await self._async_read("state", self._client.get_state())
+                result = name, info, state
         finally:
-            _LOGGER.debug("Another operation has started = %s", self._lock.locked())
-            if not self._lock.locked():
-                await self._client.disconnect()
+            await self._async_disconnect_if_idle(operation)
+        self.poll_duration.add(time.monotonic() - started)
+        return result
+
+    async def _async_refresh(
+        self,
+        log_failures: bool = True,
+        raise_on_auth_failed: bool = False,
+        scheduled: bool = False,
+        raise_on_entry_error: bool = False,
+    ) -> None:
+        """Poll once the device is free, unless the poll is skipped.
+
+        Skipped polls leave data, listeners and the update status untouched.
+        Only polls on the update interval may wait for a better link, and a
+        poll is preempted if a command is queued before it gets the device.
+        """
+        if (
+            scheduled
+            and self.data is not None
+            and not await self._async_wait_for_link()
+        ):
+            _LOGGER.debug("Skipping poll, link quality is poor")
+            self._async_skip_refresh()
+            return
+        try:
+            async with self._async_acquire(BonecoOperationPriority.POLL) as operation:
+                self._poll_operation = operation
+                try:
+                    await super()._async_refresh(
+                        log_failures,
+                        raise_on_auth_failed,
+                        scheduled,
+                        raise_on_entry_error,
+                    )
+                finally:
+                    self._poll_operation = None
+        except BonecoOperationPreempted:
+            # The command requests a refresh once it's done
+            _LOGGER.debug("Poll was preempted by a command")
+            self._async_skip_refresh()
+
+    @callback
+    def _async_skip_refresh(self) -> None:
+        """Wait for the next poll without updating anything."""
+        if self._listeners and not self.hass.is_stopping:
+            self._schedule_refresh()
 
     async def _async_fetch_state(self) -> BonecoCombinedState:
+        assert self._poll_operation is not None
+        self._skipped_polls = 0
+        self.metrics.polls += 1
         try:
-            async with self._lock, asyncio.timeout(UPDATE_TIMEOUT):
-                await self._client.connect()
-                name = await self._client.get_device_name()
-                info = await self._client.get_device_info()
-                state = await self._client.get_state()
+            with self.tracer.trace("poll"):
+                name, info, state = await self._async_read_device(self._poll_operation)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
                 _LOGGER.debug(
                     "Fetched device name='%s', device info='%s', device state='%s'",
                     name,
                     vars(info),
                     vars(state),
                 )
-                if self.device_info is None:
-                    self.device_info = dr.DeviceInfo(
-                        identifiers={(DOMAIN, self.auth_data.address)},
-                        connections={(dr.CONNECTION_BLUETOOTH, self.auth_data.address)},
-                        manufacturer=MANUFACTURER,
-                        model=self.auth_data.name,
-                        name=name,
-                        serial_number=info.serial_number,
-                        sw_version=info.software_version,
-                        hw_version=info.hardware_version,
-                    )
-                return BonecoCombinedState(name, info, state)
+            if self.device_info is None:
+                self.device_info = dr.DeviceInfo(
+                    identifiers={(DOMAIN, self.auth_data.address)},
+                    connections={(dr.CONNECTION_BLUETOOTH, self.auth_data.address)},
+                    manufacturer=MANUFACTURER,
+                    model=self.auth_data.name,
+                    name=name,
+                    serial_number=info.serial_number,
+                    sw_version=info.software_version,
+                    hw_version=info.hardware_version,
+                )
+            self._rebase_pending_writes(state)
+            self._async_publish_measurements(info)
+            return BonecoCombinedState(name, info, state)
         except Exception as err:
+            self.metrics.poll_failures += 1
             raise UpdateFailed(f"Unable to fetch data: {err}") from err
-        finally:
-            _LOGGER.debug("Another operation has started = %s", self._lock.locked())
-            if not self._lock.locked():
-                await self._client.disconnect()
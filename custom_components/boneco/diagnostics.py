@@ -0,0 +1,47 @@
+"""Diagnostics support for Boneco."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_ENTRY_TYPE, ENTRY_TYPE_FLEET
+from .coordinator import BonecoConfigEntry
+
+if TYPE_CHECKING:
+    from .fleet import BonecoFleetConfigEntry
+
+TO_REDACT = {CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: BonecoConfigEntry | BonecoFleetConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET:
+        return {
+            "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+            "fleet": entry.runtime_data.as_dict(),
+        }
+    coordinator = entry.runtime_data
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "statistics": {
+            "command_latency": coordinator.command_latency.as_dict(),
+            "poll_duration": {
+                "reads": "pipelined" if coordinator.pipelined_reads else "sequential",
+                **coordinator.poll_duration.as_dict(),
+            },
+            "timeouts": dict(coordinator.timeout_counts),
+        },
+        "link": coordinator.link.as_dict(),
+        "last_burst": coordinator.last_burst,
+        "property_costs": (
+            coordinator.property_stats.as_dict()
+            if coordinator.property_stats is not None
+            else None
+        ),
+    }
@@ -1,6 +1,7 @@
 """An abstract class common to all Boneco entities."""
 
 from collections.abc import Callable
+import time
 from typing import Any, Generic, TypeVar
 
 from homeassistant.helpers.entity import EntityDescription
@@ -12,6 +13,45 @@ from .models import BonecoCombinedState
 
 T = TypeVar("T")
 
+_ACCOUNTED_CLASSES: dict[type, type] = {}
+
+
+def _timed_property(name: str, prop: property) -> property:
+    """Wrap a property to record its calls in the property statistics."""
+    getter = prop.fget
+
+    def timed(self: "BonecoEntity") -> Any:
+        started = time.perf_counter()
+        try:
+            return getter(self)
+        finally:
+            self.coordinator.property_stats.add(
+                self.entity_id or self.unique_id,
+                name,
+                time.perf_counter() - started,
+            )
+
+    return property(timed)
+
+
+def _accounted_class(cls: type["BonecoEntity"]) -> type["BonecoEntity"]:
+    """Return a subclass of the entity class with timed properties.
+
+    Only properties of the integration are wrapped, entities without
+    accounting keep their class and don't pay for it.
+    """
+    if (accounted := _ACCOUNTED_CLASSES.get(cls)) is not None:
+        return accounted
+    namespace: dict[str, Any] = {"__module__": cls.__module__}
+    for klass in cls.__mro__:
+        if not klass.__module__.startswith(__package__):
+            continue
+        for name, attr in vars(klass).items():
+            if isinstance(attr, property) and name not in namespace:
+                namespace[name] = _timed_property(name, attr)
+    accounted = _ACCOUNTED_CLASSES[cls] = type(cls)(cls.__name__, (cls,), namespace)
+    return accounted
+
 
 class BonecoEntity(CoordinatorEntity[BonecoDataUpdateCoordinator]):
     """Generic entity encapsulating common attributes of Boneco device."""
@@ -26,6 +66,8 @@ class BonecoEntity(CoordinatorEntity[BonecoDataUpdateCoordinator]):
         """Popuates common attributes."""
         super().__init__(coordinator, context)
         self._attr_device_info = coordinator.device_info
+        if coordinator.property_stats is not None:
+            self.__class__ = _accounted_class(type(self))
 
 
 class BonecoEntityDescription(EntityDescription):
@@ -0,0 +1,176 @@
+"""Running aggregates over all Boneco devices."""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN, SIGNAL_DEVICE_UPDATED
+from .coordinator import BonecoDataUpdateCoordinator
+
+type BonecoFleetConfigEntry = ConfigEntry[BonecoFleet]
+
+
+class _Aggregate:
+    """Running count, sum and extremes of values from many devices.
+
+    Values are kept in buckets, so the extremes only have to be searched
+    again when the last device with the current extreme value goes away.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the aggregate."""
+        self._buckets: Counter[float] = Counter()
+        self._total = 0.0
+        self.count = 0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of all values."""
+        return round(self._total / self.count, 1) if self.count else None
+
+    def add(self, value: float | None) -> None:
+        """Add the value of a device."""
+        if value is None:
+            return
+        self._buckets[value] += 1
+        self._total += value
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def remove(self, value: float | None) -> None:
+        """Remove the previously added value of a device."""
+        if value is None:
+            return
+        self._buckets[value] -= 1
+        self._total -= value
+        self.count -= 1
+        if self._buckets[value]:
+            return
+        del self._buckets[value]
+        if not self._buckets:
+            self._total = 0.0
+        if value == self.min:
+            self.min = min(self._buckets, default=None)
+        if value == self.max:
+            self.max = max(self._buckets, default=None)
+
+
+@dataclass(frozen=True)
+class _Contribution:
+    """Values a single device adds to the aggregates."""
+
+    humidity: float | None
+    pm25: float | None
+    no_water: bool
+    fan_error: bool
+
+    @classmethod
+    def from_coordinator(
+        cls, coordinator: BonecoDataUpdateCoordinator
+    ) -> _Contribution | None:
+        """Build the contribution from the last update of the device."""
+        if not coordinator.last_update_success or coordinator.data is None:
+            return None
+        info = coordinator.data.info
+        return cls(
+            humidity=info.humidity,
+            pm25=info.particle_value if info.has_particle_sensor else None,
+            no_water=not coordinator.data.state.is_air_fan and bool(info.no_water),
+            fan_error=bool(info.fan_error),
+        )
+
+
+class BonecoFleet:
+    """Keeps aggregates over all devices, updated per device update."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the fleet."""
+        self.hass = hass
+        self.humidity = _Aggregate()
+        self.pm25 = _Aggregate()
+        self.no_water = 0
+        self.fan_error = 0
+        self._contributions: dict[str, _Contribution] = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @property
+    def devices(self) -> int:
+        """Return the number of devices with known values."""
+        return len(self._contributions)
+
+    @callback
+    def async_start(self, entry: BonecoFleetConfigEntry) -> None:
+        """Follow updates of all loaded devices until the entry is unloaded."""
+        entry.async_on_unload(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_DEVICE_UPDATED, self._async_device_updated
+            )
+        )
+        for device_entry in self.hass.config_entries.async_loaded_entries(DOMAIN):
+            if isinstance(device_entry.runtime_data, BonecoDataUpdateCoordinator):
+                self._async_device_updated(
+                    device_entry.entry_id, device_entry.runtime_data
+                )
+
+    @callback
+    def async_add_listener(self, listener: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for changes of the aggregates."""
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _async_device_updated(
+        self, entry_id: str, coordinator: BonecoDataUpdateCoordinator | None
+    ) -> None:
+        """Replace the values of a device, None removes the device."""
+        new = (
+            _Contribution.from_coordinator(coordinator)
+            if coordinator is not None
+            else None
+        )
+        old = self._contributions.pop(entry_id, None)
+        if new == old:
+            if new is not None:
+                self._contributions[entry_id] = new
+            return
+        if old is not None:
+            self.humidity.remove(old.humidity)
+            self.pm25.remove(old.pm25)
+            self.no_water -= old.no_water
+            self.fan_error -= old.fan_error
+        if new is not None:
+            self._contributions[entry_id] = new
+            self.humidity.add(new.humidity)
+            self.pm25.add(new.pm25)
+            self.no_water += new.no_water
+            self.fan_error += new.fan_error
+        for listener in list(self._listeners):
+            listener()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the aggregates suitable for diagnostics."""
+        return {
+            "devices": self.devices,
+            "humidity": {
+                "mean": self.humidity.mean,
+                "min": self.humidity.min,
+                "max": self.humidity.max,
+            },
+            "pm25_max": self.pm25.max,
+            "no_water": self.no_water,
+            "fan_error": self.fan_error,
+        }
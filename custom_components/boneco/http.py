@@ -0,0 +1,120 @@
+"""Metrics of Boneco devices in the Prometheus text exposition format."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+from aiohttp import web
+
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .coordinator import BonecoDataUpdateCoordinator
+from .metrics import BonecoHistogram
+
+# Name, help text and attribute of the counters of every device
+COUNTERS = (
+    ("polls", "Polls of the device", "polls"),
+    ("poll_failures", "Polls which failed", "poll_failures"),
+    ("write_failures", "State writes which failed", "write_failures"),
+    ("retries", "Retries of failed state writes", "retries"),
+    (
+        "skipped_writes",
+        "Snapshot restores not written as nothing differed",
+        "skipped_writes",
+    ),
+)
+HISTOGRAMS = (
+    ("connect_latency_seconds", "Time to connect to the device", "connect_latency"),
+    ("write_latency_seconds", "Time of state write requests", "write_latency"),
+)
+
+
+@callback
+def async_setup_http(hass: HomeAssistant) -> None:
+    """Register the HTTP views of the integration."""
+    hass.http.register_view(BonecoMetricsView)
+
+
+class BonecoMetricsView(HomeAssistantView):
+    """Serves counters and histograms of all loaded devices.
+
+    Values are kept in memory by the coordinators, so a scrape never talks
+    to a device.
+    """
+
+    url = f"/api/{DOMAIN}/metrics"
+    name = f"api:{DOMAIN}:metrics"
+    requires_auth = True
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Render the metrics."""
+        hass = request.app[KEY_HASS]
+        coordinators = [
+            entry.runtime_data
+            for entry in hass.config_entries.async_loaded_entries(DOMAIN)
+            if isinstance(entry.runtime_data, BonecoDataUpdateCoordinator)
+        ]
+        return web.Response(
+            text="".join(_render(coordinators)), content_type="text/plain"
+        )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return (
+        "{"
+        + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+        + "}"
+    )
+
+
+def _render(coordinators: list[BonecoDataUpdateCoordinator]) -> Iterator[str]:
+    devices = [
+        (
+            coordinator.metrics,
+            {
+                "address": coordinator.auth_data.address,
+                "name": coordinator.auth_data.name,
+            },
+        )
+        for coordinator in coordinators
+    ]
+    for name, help_text, attribute in COUNTERS:
+        yield f"# HELP {DOMAIN}_{name}_total {help_text}.\n"
+        yield f"# TYPE {DOMAIN}_{name}_total counter\n"
+        for metrics, labels in devices:
+            value = getattr(metrics, attribute)
+            yield f"{DOMAIN}_{name}_total{_labels(**labels)} {value}\n"
+    for name, help_text, attribute in HISTOGRAMS:
+        yield f"# HELP {DOMAIN}_{name} {help_text}.\n"
+        yield f"# TYPE {DOMAIN}_{name} histogram\n"
+        for metrics, labels in devices:
+            yield from _render_histogram(
+                f"{DOMAIN}_{name}", getattr(metrics, attribute), labels
+            )
+    yield f"# HELP {DOMAIN}_lock_wait_seconds Time operations waited for the device.\n"
+    yield f"# TYPE {DOMAIN}_lock_wait_seconds histogram\n"
+    for metrics, labels in devices:
+        for operation, histogram in sorted(metrics.lock_wait.items()):
+            yield from _render_histogram(
+                f"{DOMAIN}_lock_wait_seconds",
+                histogram,
+                {**labels, "operation": operation},
+            )
+
+
+def _render_histogram(
+    name: str, histogram: BonecoHistogram, labels: dict[str, str]
+) -> Iterator[str]:
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts, strict=False):
+        cumulative += count
+        yield f"{name}_bucket{_labels(**labels, le=str(bound))} {cumulative}\n"
+    yield f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}\n"
+    yield f"{name}_sum{_labels(**labels)} {histogram.sum}\n"
+    yield f"{name}_count{_labels(**labels)} {histogram.count}\n"
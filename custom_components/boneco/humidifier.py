@@ -5,10 +5,6 @@ import logging
 from typing import Any
 
 from homeassistant.components.humidifier import (
-    MODE_AUTO,
-    MODE_BABY,
-    MODE_NORMAL,
-    MODE_SLEEP,
     HumidifierDeviceClass,
     HumidifierEntity,
     HumidifierEntityDescription,
@@ -22,26 +18,16 @@ from pyboneco import (
     MAX_HUMIDITY,
     MIN_HUMIDITY,
     BonecoDeviceState,
-    BonecoModeStatus,
     BonecoOperationModeConfig,
 )
 
+from .const import BONECO_MODE_MAPPING, BONECO_MODE_REVERSE_MAPPING
 from .coordinator import BonecoConfigEntry, BonecoDataUpdateCoordinator
 from .entity import BonecoEntity, BonecoEntityDescription
 from .models import BonecoCombinedState
 
 _LOGGER = logging.getLogger(__name__)
 
-BONECO_MODE_MAPPING: dict[BonecoModeStatus, str] = {
-    BonecoModeStatus.CUSTOM: MODE_NORMAL,
-    BonecoModeStatus.AUTO: MODE_AUTO,
-    BonecoModeStatus.BABY: MODE_BABY,
-    BonecoModeStatus.SLEEP: MODE_SLEEP,
-}
-BONECO_MODE_REVERSE_MAPPING: dict[str, BonecoModeStatus] = {
-    ha_mode: boneco_mode for boneco_mode, ha_mode in BONECO_MODE_MAPPING.items()
-}
-
 
 @dataclass(kw_only=True)
 class BonecoHumidifierEntityDescription(
@@ -0,0 +1,86 @@
+"""Bluetooth link quality of a Boneco device."""
+
+from collections import deque
+from typing import Any
+
+from .const import LINK_GOOD_PROBABILITY, LINK_HISTORY_SIZE, RSSI_SMOOTHING_WINDOW
+
+# Signal levels at which connecting is expected to work always and never
+RSSI_GOOD = -75
+RSSI_UNUSABLE = -100
+# Past attempts within this distance of the current signal are relevant
+RSSI_NEIGHBOURHOOD = 5
+# Mean deviation in dB of a steady signal, and the excess which halves the chance
+FLUCTUATION_NORMAL = 3
+FLUCTUATION_HALVES = 10
+# Weight of the signal based guess against past attempts
+PRIOR_WEIGHT = 2
+
+
+class BonecoLinkQuality:
+    """Estimates the chance to connect from the signal and past attempts.
+
+    The signal is smoothed over advertisements together with its mean
+    deviation, as a fluctuating signal tends to drop connections halfway.
+    Past connect attempts made at a similar signal level refine the guess.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the model."""
+        self.rssi: float | None = None
+        self.fluctuation = 0.0
+        self.deferred_polls = 0
+        self.skipped_polls = 0
+        self._alpha = 2 / (RSSI_SMOOTHING_WINDOW + 1)
+        self._attempts: deque[tuple[float | None, bool]] = deque(
+            maxlen=LINK_HISTORY_SIZE
+        )
+
+    def add_rssi(self, rssi: int) -> None:
+        """Add the signal strength of an advertisement."""
+        if self.rssi is None:
+            self.rssi = rssi
+            return
+        deviation = rssi - self.rssi
+        self.rssi += self._alpha * deviation
+        self.fluctuation += self._alpha * (abs(deviation) - self.fluctuation)
+
+    def add_connect_result(self, success: bool) -> None:
+        """Add the outcome of a connect attempt at the current signal."""
+        self._attempts.append((self.rssi, success))
+
+    @property
+    def success_probability(self) -> float | None:
+        """Return the estimated chance that connecting now works."""
+        if self.rssi is None:
+            return None
+        prior = (self.rssi - RSSI_UNUSABLE) / (RSSI_GOOD - RSSI_UNUSABLE)
+        prior = min(max(prior, 0.05), 0.95)
+        prior /= 1 + max(self.fluctuation - FLUCTUATION_NORMAL, 0) / FLUCTUATION_HALVES
+        attempts = successes = 0
+        for rssi, success in self._attempts:
+            if rssi is not None and abs(rssi - self.rssi) <= RSSI_NEIGHBOURHOOD:
+                attempts += 1
+                successes += success
+        return (successes + PRIOR_WEIGHT * prior) / (attempts + PRIOR_WEIGHT)
+
+    @property
+    def is_good(self) -> bool:
+        """Return true unless connecting now is likely to fail."""
+        probability = self.success_probability
+        return probability is None or probability >= LINK_GOOD_PROBABILITY
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the model state suitable for diagnostics."""
+        probability = self.success_probability
+        return {
+            "rssi": round(self.rssi, 1) if self.rssi is not None else None,
+            "fluctuation": round(self.fluctuation, 1),
+            "success_probability": (
+                round(probability, 2) if probability is not None else None
+            ),
+            "connect_attempts": len(self._attempts),
+            "connect_failures": sum(not success for _, success in self._attempts),
+            "deferred_polls": self.deferred_polls,
+            "skipped_polls": self.skipped_polls,
+        }
@@ -0,0 +1,102 @@
+"""In-memory operation statistics for Boneco devices."""
+
+from bisect import bisect_left
+from collections import defaultdict, deque
+import math
+from typing import Any
+
+from .const import LATENCY_WINDOW, METRICS_BUCKETS
+
+
+class BonecoLatencyStats:
+    """Sliding window of operation latencies with percentile reporting."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        """Initialize the statistics."""
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Record a latency in seconds."""
+        self._samples.append(value)
+        self.count += 1
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the nearest-rank percentile of the window."""
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        rank = max(math.ceil(percent / 100 * len(samples)), 1)
+        return samples[rank - 1]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary suitable for diagnostics."""
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": max(self._samples, default=None),
+        }
+
+
+class BonecoHistogram:
+    """Cumulative histogram of latencies since start."""
+
+    def __init__(self, buckets: tuple[float, ...] = METRICS_BUCKETS) -> None:
+        """Initialize the histogram."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, value: float) -> None:
+        """Record a latency in seconds."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class BonecoDeviceMetrics:
+    """Counters and histograms of device operations since start."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.polls = 0
+        self.poll_failures = 0
+        self.write_failures = 0
+        self.retries = 0
+        self.skipped_writes = 0
+        self.connect_latency = BonecoHistogram()
+        self.write_latency = BonecoHistogram()
+        self.lock_wait: dict[str, BonecoHistogram] = defaultdict(BonecoHistogram)
+
+
+class BonecoPropertyStats:
+    """Calls of entity properties and the time spent in them."""
+
+    def __init__(self) -> None:
+        """Initialize the statistics."""
+        self.updates = 0
+        self._calls: defaultdict[tuple[str, str], int] = defaultdict(int)
+        self._seconds: defaultdict[tuple[str, str], float] = defaultdict(float)
+
+    def add(self, entity_id: str, name: str, seconds: float) -> None:
+        """Record a call of a property."""
+        self._calls[entity_id, name] += 1
+        self._seconds[entity_id, name] += seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return costs per update, most expensive properties first."""
+        updates = max(self.updates, 1)
+        entities: dict[str, dict[str, Any]] = {}
+        for key, seconds in sorted(
+            self._seconds.items(), key=lambda item: item[1], reverse=True
+        ):
+            entity_id, name = key
+            entities.setdefault(entity_id, {})[name] = {
+                "calls": self._calls[key],
+                "calls_per_update": round(self._calls[key] / updates, 2),
+                "us_per_update": round(seconds / updates * 1e6, 1),
+            }
+        return {"updates": self.updates, "entities": entities}
@@ -1,6 +1,84 @@
-from dataclasses import dataclass
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, replace
+from typing import Any
 
-from pyboneco import BonecoDeviceInfo, BonecoDeviceState
+from pyboneco import (
+    BonecoDeviceInfo,
+    BonecoDeviceState,
+    BonecoModeStatus,
+    BonecoOperationMode,
+)
+
+from .const import (
+    CONF_AUTH_TIMEOUT,
+    CONF_CONNECT_TIMEOUT,
+    CONF_READ_TIMEOUT,
+    CONF_PROFILE,
+    CONF_WRITE_TIMEOUT,
+    DEFAULT_AUTH_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_PROFILE,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_WRITE_TIMEOUT,
+    PROFILE_BALANCED,
+    PROFILE_ECO,
+    PROFILE_RESPONSIVE,
+)
+
+
+# Writable fields of BonecoDeviceState with converters from stored values.
+# The order is the order of applying, changing fan level resets mode status.
+STATE_FIELDS: dict[str, Callable[[Any], Any]] = {
+    "operating_mode": BonecoOperationMode,
+    "fan_level": int,
+    "mode_status": BonecoModeStatus,
+    "target_humidity": int,
+    "is_enabled": bool,
+    "is_locked": bool,
+    "is_always_history_active": bool,
+    "min_led_brightness": int,
+    "max_led_brightness": int,
+}
+
+
+def get_state_fields(state: BonecoDeviceState) -> dict[str, Any]:
+    """Return values of all writable fields of the state."""
+    return {name: getattr(state, name) for name in STATE_FIELDS}
+
+
+def set_state_fields(state: BonecoDeviceState, fields: dict[str, Any]) -> list[str]:
+    """Set fields which differ from the state, returns the names of changed ones.
+
+    Fields are compared one after another, so a field reset by an earlier
+    one is set again.
+    """
+    changed = []
+    for name in STATE_FIELDS:
+        if name in fields and getattr(state, name) != fields[name]:
+            setattr(state, name, fields[name])
+            changed.append(name)
+    return changed
+
+
+# Measurements of BonecoDeviceInfo by their public names
+MEASUREMENTS: dict[str, str] = {
+    "humidity": "humidity",
+    "temperature": "temperature",
+    "pm25": "particle_value",
+    "voc": "voc",
+}
+
+
+def get_measurements(info: BonecoDeviceInfo) -> dict[str, float | None]:
+    """Return all measurements of the device info.
+
+    pyboneco reports the particle value of devices without a sensor as
+    false, so it's left out like other missing values.
+    """
+    measurements = {name: getattr(info, attr) for name, attr in MEASUREMENTS.items()}
+    if not info.has_particle_sensor:
+        measurements["pm25"] = None
+    return measurements
 
 
 @dataclass
@@ -8,3 +86,70 @@ class BonecoCombinedState:
     name: str
     info: BonecoDeviceInfo
     state: BonecoDeviceState
+
+
+@dataclass(frozen=True)
+class BonecoTimeouts:
+    """Deadlines in seconds for single device operations."""
+
+    connect: float = DEFAULT_CONNECT_TIMEOUT
+    auth: float = DEFAULT_AUTH_TIMEOUT
+    read: float = DEFAULT_READ_TIMEOUT
+    write: float = DEFAULT_WRITE_TIMEOUT
+
+    @classmethod
+    def from_options(
+        cls, options: Mapping[str, Any], defaults: "BonecoTimeouts | None" = None
+    ) -> "BonecoTimeouts":
+        """Build timeouts from config entry options."""
+        defaults = defaults or cls()
+        return cls(
+            connect=options.get(CONF_CONNECT_TIMEOUT, defaults.connect),
+            auth=options.get(CONF_AUTH_TIMEOUT, defaults.auth),
+            read=options.get(CONF_READ_TIMEOUT, defaults.read),
+            write=options.get(CONF_WRITE_TIMEOUT, defaults.write),
+        )
+
+
+@dataclass(frozen=True)
+class BonecoProfile:
+    """Tuning of polling, connection handling and writes of a device."""
+
+    update_interval: float
+    # Seconds an idle connection is kept open for the next request, 0 closes it
+    keep_connected: float
+    # Seconds to wait for further changes before writing them at once
+    write_cooldown: float
+    timeouts: BonecoTimeouts
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> "BonecoProfile":
+        """Return the selected profile, timeouts can be overridden one by one."""
+        profile = PROFILES[options.get(CONF_PROFILE, DEFAULT_PROFILE)]
+        return replace(
+            profile, timeouts=BonecoTimeouts.from_options(options, profile.timeouts)
+        )
+
+
+PROFILES: dict[str, BonecoProfile] = {
+    # Rare short connections, writes are collected for longer
+    PROFILE_ECO: BonecoProfile(
+        update_interval=300,
+        keep_connected=0,
+        write_cooldown=3,
+        timeouts=BonecoTimeouts(connect=30, auth=15, read=10, write=10),
+    ),
+    PROFILE_BALANCED: BonecoProfile(
+        update_interval=60,
+        keep_connected=0,
+        write_cooldown=0.3,
+        timeouts=BonecoTimeouts(),
+    ),
+    # Frequent polls over a retained connection, failing fast
+    PROFILE_RESPONSIVE: BonecoProfile(
+        update_interval=15,
+        keep_connected=30,
+        write_cooldown=0.1,
+        timeouts=BonecoTimeouts(connect=10, auth=5, read=3, write=3),
+    ),
+}
@@ -0,0 +1,128 @@
+"""Persistent queue of state changes not yet written to a Boneco device."""
+
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from pyboneco import BonecoDeviceState
+
+from .const import DOMAIN, PENDING_WRITES_SAVE_DELAY, PENDING_WRITES_TTL
+from .models import STATE_FIELDS
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+def _storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.{entry_id}.pending_writes"
+
+
+async def async_remove_pending_writes(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove persisted changes of a removed config entry."""
+    await Store(hass, STORAGE_VERSION, _storage_key(entry_id)).async_remove()
+
+
+class BonecoPendingWrites:
+    """Changes acknowledged to the user which the device hasn't received yet.
+
+    Every changed field keeps the value it was changed from, so the change can
+    be replayed on top of a freshly read state after a restart or an outage.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the queue."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, _storage_key(entry_id)
+        )
+        self._fields: dict[str, tuple[Any, Any]] = {}
+        self._created: float | None = None
+
+    def __bool__(self) -> bool:
+        """Return true if there are changes to write."""
+        return bool(self._fields)
+
+    @property
+    def expired(self) -> bool:
+        """Return true if the changes are too old to be written."""
+        return (
+            self._created is not None
+            and time.time() - self._created > PENDING_WRITES_TTL
+        )
+
+    async def async_load(self) -> None:
+        """Load changes which were not written before the restart."""
+        if not (data := await self._store.async_load()):
+            return
+        self._created = data["created"]
+        self._fields = {
+            name: (STATE_FIELDS[name](base), STATE_FIELDS[name](target))
+            for name, (base, target) in data["fields"].items()
+            if name in STATE_FIELDS
+        }
+        if self.expired:
+            _LOGGER.debug("Dropping expired pending writes %s", self._fields)
+            self.clear()
+
+    def record(self, before: dict[str, Any], after: dict[str, Any]) -> None:
+        """Record changed fields between two snapshots of the state."""
+        changed = False
+        for name, value in after.items():
+            if before[name] == value:
+                continue
+            base = self._fields[name][0] if name in self._fields else before[name]
+            self._fields[name] = (base, value)
+            changed = True
+        if changed:
+            self._created = self._created or time.time()
+            self._store.async_delay_save(self._data, PENDING_WRITES_SAVE_DELAY)
+
+    def clear(self) -> None:
+        """Forget all changes."""
+        if self._created is None:
+            return
+        self._fields = {}
+        self._created = None
+        self._store.async_delay_save(self._data, PENDING_WRITES_SAVE_DELAY)
+
+    def apply(self, state: BonecoDeviceState) -> bool:
+        """Apply changes to a freshly read state.
+
+        Fields which already have the target value are skipped. A field which
+        was changed on the device itself in the meantime wins over the queued
+        change. Returns true if the state has to be written.
+        """
+        if self.expired:
+            _LOGGER.debug("Dropping expired pending writes %s", self._fields)
+            self.clear()
+            return False
+
+        needs_write = False
+        for name in STATE_FIELDS:
+            if name not in self._fields:
+                continue
+            base, target = self._fields[name]
+            current = getattr(state, name)
+            if current == target:
+                continue
+            if current != base:
+                _LOGGER.debug(
+                    "Field %s was changed on device to %s, dropping queued %s",
+                    name,
+                    current,
+                    target,
+                )
+                del self._fields[name]
+                continue
+            setattr(state, name, target)
+            needs_write = True
+        if needs_write:
+            self._store.async_delay_save(self._data, PENDING_WRITES_SAVE_DELAY)
+        else:
+            self.clear()
+        return needs_write
+
+    def _data(self) -> dict[str, Any]:
+        return {"created": self._created, "fields": self._fields}
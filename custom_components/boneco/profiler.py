@@ -0,0 +1,164 @@
+"""On-demand CPU and allocation profiling of Boneco devices."""
+
+import asyncio
+import cProfile
+from functools import partial
+import logging
+from pathlib import Path
+import pstats
+import time
+import tracemalloc
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, EVENT_PROFILE_CAPTURED, PROFILE_MAX_DURATION
+from .coordinator import BonecoDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_PROFILE_SESSION: HassKey["BonecoProfileSession"] = HassKey(
+    f"{DOMAIN}_profile_session"
+)
+
+# Frames kept per allocation, enough to see the caller in the integration
+TRACEMALLOC_FRAMES = 10
+
+
+class BonecoProfileSession:
+    """Profiles the event loop until every device has run a number of updates.
+
+    An update cycle includes the device reads and the state writes of all
+    entities of the device. Other work of the event loop during the session
+    is profiled as well, the report can be filtered by file name.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinators: dict[str, BonecoDataUpdateCoordinator],
+        cycles: int,
+        top: int,
+    ) -> None:
+        """Initialize the session."""
+        self.hass = hass
+        self._coordinators = coordinators
+        self._remaining = dict.fromkeys(coordinators, cycles)
+        self._cycles = cycles
+        self._top = top
+        self._done = asyncio.Event()
+
+    @staticmethod
+    @callback
+    def async_is_running(hass: HomeAssistant) -> bool:
+        """Return true if a session is running."""
+        return DATA_PROFILE_SESSION in hass.data
+
+    @callback
+    def async_start(self) -> None:
+        """Start profiling in the background."""
+        assert not self.async_is_running(self.hass)
+        self.hass.data[DATA_PROFILE_SESSION] = self
+        self.hass.async_create_background_task(self._async_run(), f"{DOMAIN} profile")
+
+    @callback
+    def _async_cycle_done(self, device_id: str) -> None:
+        self._remaining[device_id] -= 1
+        if all(remaining <= 0 for remaining in self._remaining.values()):
+            self._done.set()
+
+    async def _async_run(self) -> None:
+        started = time.monotonic()
+        start_tracemalloc = not tracemalloc.is_tracing()
+        if start_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        profiler = cProfile.Profile()
+        unsubs: list[CALLBACK_TYPE] = []
+        try:
+            profiler.enable()
+            for device_id, coordinator in self._coordinators.items():
+                unsubs.append(
+                    coordinator.async_add_listener(
+                        partial(self._async_cycle_done, device_id)
+                    )
+                )
+            # Start with a cycle right away instead of waiting for the next poll
+            for coordinator in self._coordinators.values():
+                await coordinator.async_request_refresh()
+            async with asyncio.timeout(PROFILE_MAX_DURATION):
+                await self._done.wait()
+        except TimeoutError:
+            _LOGGER.warning(
+                "Devices didn't finish %s update cycles within %s seconds",
+                self._cycles,
+                PROFILE_MAX_DURATION,
+            )
+        except BaseException:
+            if start_tracemalloc:
+                tracemalloc.stop()
+            raise
+        finally:
+            profiler.disable()
+            for unsub in unsubs:
+                unsub()
+            del self.hass.data[DATA_PROFILE_SESSION]
+
+        duration = time.monotonic() - started
+        path = Path(
+            self.hass.config.path(DOMAIN, "profiles", f"profile_{int(time.time())}")
+        )
+        await self.hass.async_add_executor_job(
+            self._write_report, path, profiler, duration, start_tracemalloc
+        )
+        _LOGGER.info("Saved profile of %s to %s", ", ".join(self._names), path)
+        self.hass.bus.async_fire(
+            EVENT_PROFILE_CAPTURED,
+            {
+                "devices": list(self._coordinators),
+                "stats": str(path.with_suffix(".prof")),
+                "report": str(path.with_suffix(".txt")),
+                "duration": round(duration, 1),
+            },
+        )
+
+    @property
+    def _names(self) -> list[str]:
+        return [
+            coordinator.auth_data.name for coordinator in self._coordinators.values()
+        ]
+
+    def _write_report(
+        self,
+        path: Path,
+        profiler: cProfile.Profile,
+        duration: float,
+        stop_tracemalloc: bool,
+    ) -> None:
+        """Dump call stats and allocations, runs in the executor."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        if stop_tracemalloc:
+            tracemalloc.stop()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path.with_suffix(".prof"))
+        with path.with_suffix(".txt").open("w", encoding="utf-8") as file:
+            file.write(
+                f"Devices: {', '.join(self._names)}\n"
+                f"Update cycles: {self._cycles}\n"
+                f"Duration: {duration:.1f} s\n\n"
+            )
+            stats = pstats.Stats(profiler, stream=file)
+            for sort_key, title in (
+                (pstats.SortKey.CUMULATIVE, "cumulative time"),
+                (pstats.SortKey.TIME, "own time"),
+            ):
+                file.write(f"Top {self._top} calls by {title}\n")
+                stats.sort_stats(sort_key).print_stats(self._top)
+            file.write(f"Top {self._top} allocations by line\n")
+            for statistic in snapshot.statistics("lineno")[: self._top]:
+                file.write(f"{statistic}\n")
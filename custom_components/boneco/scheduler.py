@@ -0,0 +1,136 @@
+"""Prioritized access to a Boneco device connection."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+import heapq
+import itertools
+
+
+class BonecoOperationPriority(IntEnum):
+    """Priority of a device operation, lower values run first."""
+
+    COMMAND = 0
+    POLL = 1
+
+
+class BonecoOperationPreempted(Exception):
+    """Queued operation was dropped in favor of a higher priority one."""
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: BonecoOperationPriority
+    sequence: int
+    operation: "BonecoOperation" = field(compare=False)
+    future: asyncio.Future[None] = field(compare=False)
+
+
+class BonecoOperation:
+    """Handle of an operation which holds or waits for the device."""
+
+    def __init__(
+        self, scheduler: "BonecoOperationScheduler", priority: BonecoOperationPriority
+    ) -> None:
+        """Initialize the operation."""
+        self.priority = priority
+        self.started = False
+        self._scheduler = scheduler
+
+    @property
+    def holds_device(self) -> bool:
+        """Return true if the operation currently holds the device."""
+        return self._scheduler.holder is self
+
+    async def async_yield(self) -> None:
+        """Let waiting operations with a higher priority run first.
+
+        Must be called between device requests. The operation is queued again
+        with its own priority and resumes afterwards, so the open connection is
+        handed over instead of being torn down.
+        """
+        if self._scheduler.has_waiters(self.priority):
+            self._scheduler.release(self)
+            await self._scheduler.async_wait(self)
+
+
+class BonecoOperationScheduler:
+    """Grants exclusive device access to operations in priority order.
+
+    Only one operation talks to the device at a time. Waiting operations are
+    served by priority and then in arrival order, so user commands jump ahead
+    of background polls.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the scheduler."""
+        self._waiters: list[_Waiter] = []
+        self._counter = itertools.count()
+        self.holder: BonecoOperation | None = None
+
+    def has_waiters(self, below: BonecoOperationPriority | None = None) -> bool:
+        """Return true if an operation (with a higher priority) is waiting."""
+        return any(
+            not waiter.future.done() and (below is None or waiter.priority < below)
+            for waiter in self._waiters
+        )
+
+    @asynccontextmanager
+    async def acquire(
+        self, priority: BonecoOperationPriority
+    ) -> AsyncIterator[BonecoOperation]:
+        """Hold the device for the duration of the context."""
+        operation = BonecoOperation(self, priority)
+        await self.async_wait(operation)
+        try:
+            yield operation
+        finally:
+            if operation.holds_device:
+                self.release(operation)
+
+    def preempt(self, priority: BonecoOperationPriority) -> None:
+        """Drop queued operations with the given priority that haven't started."""
+        for waiter in self._waiters:
+            if (
+                waiter.priority == priority
+                and not waiter.operation.started
+                and not waiter.future.done()
+            ):
+                waiter.future.set_exception(BonecoOperationPreempted())
+        self._waiters = [w for w in self._waiters if not w.future.done()]
+        heapq.heapify(self._waiters)
+
+    async def async_wait(self, operation: BonecoOperation) -> None:
+        """Wait until the operation is granted the device."""
+        if self.holder is None and not self.has_waiters():
+            self.holder = operation
+            operation.started = True
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = _Waiter(operation.priority, next(self._counter), operation, future)
+        heapq.heappush(self._waiters, waiter)
+        try:
+            await future
+        except BaseException:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            if operation.holds_device:
+                # Access was granted right before cancellation, pass it on
+                self.release(operation)
+            raise
+        operation.started = True
+
+    def release(self, operation: BonecoOperation) -> None:
+        """Pass the device to the next waiting operation."""
+        assert self.holder is operation
+        self.holder = None
+        while self._waiters:
+            waiter = heapq.heappop(self._waiters)
+            if not waiter.future.done():
+                self.holder = waiter.operation
+                waiter.future.set_result(None)
+                return
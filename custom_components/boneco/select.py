@@ -9,9 +9,9 @@ from homeassistant.helpers.entity_platform import (
 )
 from pyboneco import BonecoDeviceState, BonecoOperationMode
 
+from .capabilities import get_operating_modes, has_several_operating_modes
 from .coordinator import BonecoConfigEntry, BonecoDataUpdateCoordinator
 from .entity import BonecoEntity, BonecoWritableValueEntityDescription
-from .models import BonecoCombinedState
 
 
 @dataclass(kw_only=True)
@@ -29,7 +29,7 @@ SELECTS: tuple[BonecoSelectEntityDescription, ...] = (
     BonecoSelectEntityDescription(
         key="operating_mode",
         translation_key="operating_mode",
-        exists_fn=lambda data: _has_several_operating_modes(data),
+        exists_fn=has_several_operating_modes,
         value_fn=lambda data: data.state.operating_mode,
         set_value_fn=_update_operating_mode,
     ),
@@ -66,7 +66,7 @@ class BonecoSelect(BonecoEntity, SelectEntity):
         self._attr_unique_id = (
             f"{coordinator.auth_data.address}-{entity_description.key}"
         )
-        self._attr_options = _get_operating_modes(self.coordinator.data)
+        self._attr_options = get_operating_modes(self.coordinator.data)
 
     @property
     def current_option(self) -> str | None:
@@ -78,17 +78,3 @@ class BonecoSelect(BonecoEntity, SelectEntity):
         await self.coordinator.update_state(
             lambda state: self.entity_description.set_value_fn(state, int(option))
         )
-
-
-def _get_operating_modes(
-    data: BonecoCombinedState,
-) -> list[str]:
-    return [
-        str(k) for k, v in data.info.device.operating_modes.items() if v is not None
-    ]
-
-
-def _has_several_operating_modes(
-    data: BonecoCombinedState,
-) -> bool:
-    return len(_get_operating_modes(data)) > 1
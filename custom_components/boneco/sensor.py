@@ -1,8 +1,12 @@
 """Support for Boneco sensors."""
 
+from __future__ import annotations
+
+from collections.abc import Callable
 from dataclasses import dataclass
+import time
+from typing import TYPE_CHECKING
 
-from homeassistant.components import bluetooth
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
@@ -12,18 +16,30 @@ from homeassistant.components.sensor import (
 from homeassistant.const import (
     CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    PERCENTAGE,
     EntityCategory,
     UnitOfTemperature,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import (
     AddEntitiesCallback as AddConfigEntryEntitiesCallback,
 )
 from homeassistant.helpers.typing import StateType
 
+from .const import (
+    CONF_ENTRY_TYPE,
+    DOMAIN,
+    ENTRY_TYPE_FLEET,
+    MANUFACTURER,
+    RSSI_UPDATE_INTERVAL,
+)
 from .coordinator import BonecoConfigEntry, BonecoDataUpdateCoordinator
 from .entity import BonecoEntity, BonecoValueEntityDescription
 
+if TYPE_CHECKING:
+    from .fleet import BonecoFleet, BonecoFleetConfigEntry
+
 PARALLEL_UPDATES = 0
 
 
@@ -83,12 +99,73 @@ SENSORS: tuple[BonecoSensorEntityDescription, ...] = (
 )
 
 
+@dataclass(kw_only=True)
+class BonecoFleetSensorEntityDescription(SensorEntityDescription):
+    """Describes Boneco fleet sensor entity."""
+
+    value_fn: Callable[[BonecoFleet], StateType]
+
+
+FLEET_SENSORS: tuple[BonecoFleetSensorEntityDescription, ...] = (
+    BonecoFleetSensorEntityDescription(
+        key="humidity_mean",
+        translation_key="humidity_mean",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.HUMIDITY,
+        value_fn=lambda fleet: fleet.humidity.mean,
+    ),
+    BonecoFleetSensorEntityDescription(
+        key="humidity_min",
+        translation_key="humidity_min",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.HUMIDITY,
+        value_fn=lambda fleet: fleet.humidity.min,
+    ),
+    BonecoFleetSensorEntityDescription(
+        key="humidity_max",
+        translation_key="humidity_max",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.HUMIDITY,
+        value_fn=lambda fleet: fleet.humidity.max,
+    ),
+    BonecoFleetSensorEntityDescription(
+        key="pm25_max",
+        translation_key="pm25_max",
+        native_unit_of_measurement=CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.PM25,
+        value_fn=lambda fleet: fleet.pm25.max,
+    ),
+    BonecoFleetSensorEntityDescription(
+        key="no_water_count",
+        translation_key="no_water_count",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.no_water,
+    ),
+    BonecoFleetSensorEntityDescription(
+        key="fan_error_count",
+        translation_key="fan_error_count",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.fan_error,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
-    entry: BonecoConfigEntry,
+    entry: BonecoConfigEntry | BonecoFleetConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up Boneco sensor based on a config entry."""
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET:
+        async_add_entities(
+            BonecoFleetSensor(entry, description) for description in FLEET_SENSORS
+        )
+        return
+
     coordinator = entry.runtime_data
     entities = [
         BonecoSensor(coordinator, description)
@@ -139,11 +216,71 @@ class BonecoSensor(BonecoEntity, SensorEntity):
 class BonecoRSSISensor(BonecoSensor):
     """Representation of a Boneco RSSI sensor."""
 
+    _written_rssi: int | None = None
+    _last_write: float = 0.0
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the link quality of the device."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_link_listener(self._async_handle_link_update)
+        )
+
+    @callback
+    def _async_handle_link_update(self) -> None:
+        """Write the smoothed RSSI if it's time."""
+        now = time.monotonic()
+        if (
+            now - self._last_write < RSSI_UPDATE_INTERVAL
+            or self.native_value == self._written_rssi
+        ):
+            return
+        self._last_write = now
+        self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and remember the reported value."""
+        self._written_rssi = self.native_value
+        super().async_write_ha_state()
+
     @property
-    def native_value(self) -> str | int | None:
+    def native_value(self) -> int | None:
         """Return the state of the sensor."""
-        if service_info := bluetooth.async_last_service_info(
-            self.hass, self.coordinator.auth_data.address
-        ):
-            return service_info.rssi
-        return None
+        if (rssi := self.coordinator.link.rssi) is None:
+            return None
+        return round(rssi)
+
+
+class BonecoFleetSensor(SensorEntity):
+    """Representation of an aggregate over all Boneco devices."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    entity_description: BonecoFleetSensorEntityDescription
+
+    def __init__(
+        self,
+        entry: BonecoFleetConfigEntry,
+        entity_description: BonecoFleetSensorEntityDescription,
+    ) -> None:
+        """Initialize the fleet sensor."""
+        self.entity_description = entity_description
+        self._fleet = entry.runtime_data
+        self._attr_unique_id = f"{entry.entry_id}-{entity_description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            entry_type=DeviceEntryType.SERVICE,
+            manufacturer=MANUFACTURER,
+            name=entry.title,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to changes of the aggregates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._fleet.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self._fleet)
@@ -0,0 +1,457 @@
+"""Services for the Boneco integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from datetime import timedelta
+import logging
+import math
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID, ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.importlib import async_import_module
+from pyboneco import (
+    MAX_HUMIDITY,
+    MAX_LED_BRIGHTNESS,
+    MIN_HUMIDITY,
+    MIN_LED_BRIGHTNESS,
+    BonecoDeviceState,
+    BonecoOperationMode,
+)
+
+from .const import (
+    AIR_FAN_SPEED_RANGE,
+    BONECO_MODE_REVERSE_MAPPING,
+    BURST_MAX_SAMPLES,
+    DEFAULT_BURST_INTERVAL,
+    DEFAULT_MAX_PARALLEL,
+    DEFAULT_SNAPSHOT,
+    DOMAIN,
+    OTHER_FAN_SPEED_RANGE,
+)
+from .coordinator import BonecoConfigEntry, BonecoDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_SET_STATE = "set_state"
+SERVICE_FLEET_SET_STATE = "fleet_set_state"
+SERVICE_START_BURST = "start_burst"
+SERVICE_RECORD_TRAFFIC = "record_traffic"
+SERVICE_PROFILE = "profile"
+SERVICE_SNAPSHOT = "snapshot"
+SERVICE_RESTORE = "restore"
+
+ATTR_IS_ON = "is_on"
+ATTR_OPERATING_MODE = "operating_mode"
+ATTR_FAN_LEVEL = "fan_level"
+ATTR_MODE = "mode"
+ATTR_TARGET_HUMIDITY = "target_humidity"
+ATTR_CHILD_LOCK = "child_lock"
+ATTR_MIN_LED_BRIGHTNESS = "min_led_brightness"
+ATTR_MAX_LED_BRIGHTNESS = "max_led_brightness"
+ATTR_MAX_PARALLEL = "max_parallel"
+ATTR_DURATION = "duration"
+ATTR_INTERVAL = "interval"
+ATTR_CYCLES = "cycles"
+ATTR_TOP = "top"
+ATTR_SNAPSHOT = "snapshot"
+
+OPERATING_MODES = {
+    mode.name.lower(): mode
+    for mode in BonecoOperationMode
+    if mode != BonecoOperationMode.NONE
+}
+
+STATE_FIELDS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_IS_ON): cv.boolean,
+        vol.Optional(ATTR_OPERATING_MODE): vol.In(OPERATING_MODES),
+        vol.Optional(ATTR_FAN_LEVEL): vol.All(
+            vol.Coerce(int), vol.Range(min=AIR_FAN_SPEED_RANGE[0])
+        ),
+        vol.Optional(ATTR_MODE): vol.In(BONECO_MODE_REVERSE_MAPPING),
+        vol.Optional(ATTR_TARGET_HUMIDITY): vol.All(
+            vol.Coerce(int), vol.Range(min=MIN_HUMIDITY, max=MAX_HUMIDITY)
+        ),
+        vol.Optional(ATTR_CHILD_LOCK): cv.boolean,
+        vol.Optional(ATTR_MIN_LED_BRIGHTNESS): vol.All(
+            vol.Coerce(int), vol.Range(min=MIN_LED_BRIGHTNESS, max=MAX_LED_BRIGHTNESS)
+        ),
+        vol.Optional(ATTR_MAX_LED_BRIGHTNESS): vol.All(
+            vol.Coerce(int), vol.Range(min=MIN_LED_BRIGHTNESS, max=MAX_LED_BRIGHTNESS)
+        ),
+    }
+)
+
+SET_STATE_SCHEMA = STATE_FIELDS_SCHEMA.extend(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+FLEET_SET_STATE_SCHEMA = STATE_FIELDS_SCHEMA.extend(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_MAX_PARALLEL, default=DEFAULT_MAX_PARALLEL): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
+    }
+)
+
+START_BURST_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_DURATION): vol.All(
+            cv.time_period,
+            cv.positive_timedelta,
+            vol.Range(max=timedelta(hours=6)),
+        ),
+        vol.Optional(ATTR_INTERVAL, default=DEFAULT_BURST_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=60)
+        ),
+    }
+)
+
+RECORD_TRAFFIC_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_DURATION): vol.All(
+            cv.time_period,
+            cv.positive_timedelta,
+            vol.Range(max=timedelta(hours=24)),
+        ),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_CYCLES, default=3): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=20)
+        ),
+        vol.Optional(ATTR_TOP, default=30): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=200)
+        ),
+    }
+)
+
+SNAPSHOT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_SNAPSHOT, default=DEFAULT_SNAPSHOT): cv.string,
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register services of the integration."""
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_STATE, _async_set_state, schema=SET_STATE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FLEET_SET_STATE,
+        _async_fleet_set_state,
+        schema=FLEET_SET_STATE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_START_BURST, _async_start_burst, schema=START_BURST_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD_TRAFFIC,
+        _async_record_traffic,
+        schema=RECORD_TRAFFIC_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, _async_profile, schema=PROFILE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SNAPSHOT, _async_snapshot, schema=SNAPSHOT_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESTORE,
+        _async_restore,
+        schema=SNAPSHOT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def _async_set_state(call: ServiceCall) -> None:
+    """Apply all requested fields to every target device with one write each."""
+    _require_fields(call.data)
+    coordinators = async_get_coordinators(call.hass, call.data[ATTR_DEVICE_ID])
+    for coordinator in coordinators.values():
+        _validate_fields(coordinator, call.data)
+
+    results = await _async_apply_state(
+        list(coordinators.values()), call.data, DEFAULT_MAX_PARALLEL
+    )
+    if failed := [result for result in results if not result["success"]]:
+        for result in failed:
+            _LOGGER.warning(
+                "Can't update state of %s: %s", result["name"], result["error"]
+            )
+        raise HomeAssistantError(
+            f"Unable to update state of {', '.join(result['name'] for result in failed)}"
+        )
+
+
+async def _async_fleet_set_state(call: ServiceCall) -> ServiceResponse:
+    """Apply the same change to many devices and report the result of each."""
+    _require_fields(call.data)
+    entries: list[BonecoConfigEntry] = [
+        entry
+        for entry in call.hass.config_entries.async_loaded_entries(DOMAIN)
+        if isinstance(entry.runtime_data, BonecoDataUpdateCoordinator)
+        and (
+            ATTR_CONFIG_ENTRY_ID not in call.data
+            or entry.entry_id in call.data[ATTR_CONFIG_ENTRY_ID]
+        )
+    ]
+    if not entries:
+        raise ServiceValidationError("No loaded Boneco devices to update")
+
+    results = await _async_apply_state(
+        [entry.runtime_data for entry in entries],
+        call.data,
+        call.data[ATTR_MAX_PARALLEL],
+    )
+    return {
+        "devices": {
+            entry.entry_id: result
+            for entry, result in zip(entries, results, strict=True)
+        }
+    }
+
+
+async def _async_start_burst(call: ServiceCall) -> None:
+    """Start high resolution sampling of measurements."""
+    duration: timedelta = call.data[ATTR_DURATION]
+    interval: float = call.data[ATTR_INTERVAL]
+    samples = math.ceil(duration.total_seconds() / interval)
+    if samples > BURST_MAX_SAMPLES:
+        raise ServiceValidationError(
+            f"A burst keeps at most {BURST_MAX_SAMPLES} samples, but {samples} "
+            "would be taken. Use a longer interval or a shorter duration"
+        )
+    coordinators = async_get_coordinators(call.hass, call.data[ATTR_DEVICE_ID])
+    for coordinator in coordinators.values():
+        if coordinator.burst_active:
+            raise ServiceValidationError(
+                f"Burst sampling of {coordinator.auth_data.name} is already running"
+            )
+    for coordinator in coordinators.values():
+        coordinator.async_start_burst(duration, interval)
+
+
+async def _async_record_traffic(call: ServiceCall) -> None:
+    """Start recording device traffic."""
+    coordinators = async_get_coordinators(call.hass, call.data[ATTR_DEVICE_ID])
+    for coordinator in coordinators.values():
+        if coordinator.recording_traffic:
+            raise ServiceValidationError(
+                f"Traffic of {coordinator.auth_data.name} is already being recorded"
+            )
+    for coordinator in coordinators.values():
+        coordinator.async_start_recording(call.data[ATTR_DURATION])
+
+
+async def _async_profile(call: ServiceCall) -> None:
+    """Start profiling the next update cycles of devices."""
+    coordinators = async_get_coordinators(call.hass, call.data[ATTR_DEVICE_ID])
+    # cProfile, pstats and tracemalloc are only loaded when profiling
+    profiler = await async_import_module(call.hass, f"{__package__}.profiler")
+    if profiler.BonecoProfileSession.async_is_running(call.hass):
+        raise ServiceValidationError("A profile is already being captured")
+    profiler.BonecoProfileSession(
+        call.hass, coordinators, call.data[ATTR_CYCLES], call.data[ATTR_TOP]
+    ).async_start()
+
+
+async def _async_snapshot(call: ServiceCall) -> None:
+    """Save the current state of devices."""
+    coordinators = async_get_coordinators(call.hass, call.data[ATTR_DEVICE_ID])
+    for coordinator in coordinators.values():
+        coordinator.async_save_snapshot(call.data[ATTR_SNAPSHOT])
+
+
+async def _async_restore(call: ServiceCall) -> ServiceResponse:
+    """Restore saved states of devices with one write each."""
+    coordinators = async_get_coordinators(call.hass, call.data[ATTR_DEVICE_ID])
+    name = call.data[ATTR_SNAPSHOT]
+    for coordinator in coordinators.values():
+        if name not in coordinator.snapshots:
+            raise ServiceValidationError(
+                f"{coordinator.auth_data.name} has no snapshot '{name}'"
+            )
+
+    semaphore = asyncio.Semaphore(DEFAULT_MAX_PARALLEL)
+
+    async def restore(coordinator: BonecoDataUpdateCoordinator) -> list[str]:
+        async with semaphore:
+            return await coordinator.async_restore_snapshot(name)
+
+    results = await asyncio.gather(
+        *(restore(coordinator) for coordinator in coordinators.values()),
+        return_exceptions=True,
+    )
+    failed: list[str] = []
+    for coordinator, result in zip(coordinators.values(), results, strict=True):
+        if isinstance(result, Exception):
+            _LOGGER.warning(
+                "Can't restore state of %s: %s", coordinator.auth_data.name, result
+            )
+            failed.append(coordinator.auth_data.name)
+    if failed:
+        raise HomeAssistantError(f"Unable to restore state of {', '.join(failed)}")
+    return {
+        "devices": {
+            device_id: {"restored": result}
+            for device_id, result in zip(coordinators, results, strict=True)
+        }
+    }
+
+
+async def _async_apply_state(
+    coordinators: list[BonecoDataUpdateCoordinator],
+    data: dict[str, Any],
+    max_parallel: int,
+) -> list[dict[str, Any]]:
+    """Write the state to all devices, at most max_parallel at a time."""
+    semaphore = asyncio.Semaphore(max_parallel)
+    update_fn = _build_update_fn(data)
+
+    async def apply(coordinator: BonecoDataUpdateCoordinator) -> dict[str, Any]:
+        result: dict[str, Any] = {"name": coordinator.auth_data.name}
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                _validate_fields(coordinator, data)
+                await coordinator.async_apply_state(update_fn)
+            except Exception as err:
+                result.update(success=False, error=str(err) or type(err).__name__)
+            else:
+                result.update(success=True, error=None)
+            result["latency"] = round(time.monotonic() - started, 3)
+        return result
+
+    return await asyncio.gather(*(apply(coordinator) for coordinator in coordinators))
+
+
+@callback
+def async_get_coordinators(
+    hass: HomeAssistant, device_ids: list[str]
+) -> dict[str, BonecoDataUpdateCoordinator]:
+    """Resolve device ids to coordinators of loaded config entries."""
+    device_registry = dr.async_get(hass)
+    coordinators: dict[str, BonecoDataUpdateCoordinator] = {}
+    for device_id in device_ids:
+        if (device := device_registry.async_get(device_id)) is None:
+            raise ServiceValidationError(f"Unknown device {device_id}")
+        for entry_id in device.config_entries:
+            entry = hass.config_entries.async_get_entry(entry_id)
+            if (
+                entry is not None
+                and entry.domain == DOMAIN
+                and entry.state is ConfigEntryState.LOADED
+                and isinstance(entry.runtime_data, BonecoDataUpdateCoordinator)
+            ):
+                coordinators[device_id] = entry.runtime_data
+                break
+        else:
+            raise ServiceValidationError(
+                f"Device {device.name} is not a loaded Boneco device"
+            )
+    return coordinators
+
+
+def _require_fields(data: dict[str, Any]) -> None:
+    """Reject calls which wouldn't change anything."""
+    if not any(str(key) in data for key in STATE_FIELDS_SCHEMA.schema):
+        raise ServiceValidationError("At least one state field must be given")
+
+
+def _validate_fields(
+    coordinator: BonecoDataUpdateCoordinator, data: dict[str, Any]
+) -> None:
+    """Check fields which depend on the device model."""
+    state = coordinator.data.state
+    if ATTR_FAN_LEVEL in data:
+        _, max_level = (
+            AIR_FAN_SPEED_RANGE if state.is_air_fan else OTHER_FAN_SPEED_RANGE
+        )
+        if data[ATTR_FAN_LEVEL] > max_level:
+            raise ServiceValidationError(
+                f"Fan level of {coordinator.auth_data.name} must be at most {max_level}"
+            )
+    if state.is_air_fan and any(
+        key in data for key in (ATTR_OPERATING_MODE, ATTR_MODE, ATTR_TARGET_HUMIDITY)
+    ):
+        raise ServiceValidationError(
+            f"{coordinator.auth_data.name} doesn't support humidifier settings"
+        )
+    operating_modes = coordinator.data.info.device.operating_modes
+    operating_mode = state.operating_mode
+    if ATTR_OPERATING_MODE in data:
+        operating_mode = OPERATING_MODES[data[ATTR_OPERATING_MODE]]
+        if operating_modes.get(operating_mode) is None:
+            raise ServiceValidationError(
+                f"{coordinator.auth_data.name} doesn't support operating mode "
+                f"{data[ATTR_OPERATING_MODE]}"
+            )
+    if ATTR_MODE in data:
+        modes = operating_modes.get(operating_mode) or {}
+        if not modes.get(BONECO_MODE_REVERSE_MAPPING[data[ATTR_MODE]]):
+            raise ServiceValidationError(
+                f"{coordinator.auth_data.name} doesn't support mode {data[ATTR_MODE]} "
+                f"in operating mode {operating_mode.name.lower()}"
+            )
+    min_brightness = data.get(ATTR_MIN_LED_BRIGHTNESS, state.min_led_brightness)
+    max_brightness = data.get(ATTR_MAX_LED_BRIGHTNESS, state.max_led_brightness)
+    if min_brightness > max_brightness:
+        raise ServiceValidationError(
+            "Min LED brightness must not be greater than max LED brightness"
+        )
+
+
+def _build_update_fn(data: dict[str, Any]) -> Callable[[BonecoDeviceState], None]:
+    """Build a function which applies the service fields to a device state."""
+
+    def update_fn(state: BonecoDeviceState) -> None:
+        # Order matters: changing fan level switches mode to custom
+        if ATTR_OPERATING_MODE in data:
+            state.operating_mode = OPERATING_MODES[data[ATTR_OPERATING_MODE]]
+        if ATTR_FAN_LEVEL in data:
+            state.fan_level = data[ATTR_FAN_LEVEL]
+        if ATTR_MODE in data:
+            state.mode_status = BONECO_MODE_REVERSE_MAPPING[data[ATTR_MODE]]
+        if ATTR_TARGET_HUMIDITY in data:
+            state.target_humidity = data[ATTR_TARGET_HUMIDITY]
+        if ATTR_IS_ON in data:
+            state.is_enabled = data[ATTR_IS_ON]
+        if ATTR_CHILD_LOCK in data:
+            state.is_locked = data[ATTR_CHILD_LOCK]
+        if ATTR_MIN_LED_BRIGHTNESS in data:
+            state.min_led_brightness = data[ATTR_MIN_LED_BRIGHTNESS]
+        if ATTR_MAX_LED_BRIGHTNESS in data:
+            state.max_led_brightness = data[ATTR_MAX_LED_BRIGHTNESS]
+
+    return update_fn
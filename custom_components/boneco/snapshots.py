@@ -0,0 +1,61 @@
+"""Saved states of a Boneco device which can be restored later."""
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from pyboneco import BonecoDeviceState
+
+from .const import DOMAIN, SNAPSHOTS_SAVE_DELAY
+from .models import STATE_FIELDS, get_state_fields
+
+STORAGE_VERSION = 1
+
+
+def _storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.{entry_id}.snapshots"
+
+
+async def async_remove_snapshots(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove snapshots of a removed config entry."""
+    await Store(hass, STORAGE_VERSION, _storage_key(entry_id)).async_remove()
+
+
+class BonecoSnapshots:
+    """Named snapshots of the writable fields of a device state."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the snapshots."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, _storage_key(entry_id)
+        )
+        self._snapshots: dict[str, dict[str, Any]] = {}
+
+    def __contains__(self, name: str) -> bool:
+        """Return true if a snapshot with the name exists."""
+        return name in self._snapshots
+
+    async def async_load(self) -> None:
+        """Load snapshots saved before the restart."""
+        if not (data := await self._store.async_load()):
+            return
+        self._snapshots = {
+            name: {
+                field: STATE_FIELDS[field](value)
+                for field, value in fields.items()
+                if field in STATE_FIELDS
+            }
+            for name, fields in data["snapshots"].items()
+        }
+
+    def get(self, name: str) -> dict[str, Any]:
+        """Return the fields of a snapshot."""
+        return self._snapshots[name]
+
+    def save(self, name: str, state: BonecoDeviceState) -> None:
+        """Save the writable fields of the state, replacing an older snapshot."""
+        self._snapshots[name] = get_state_fields(state)
+        self._store.async_delay_save(self._data, SNAPSHOTS_SAVE_DELAY)
+
+    def _data(self) -> dict[str, Any]:
+        return {"snapshots": self._snapshots}
@@ -0,0 +1,173 @@
+"""Sampled tracing of Boneco device operations to a JSON lines file."""
+
+import asyncio
+from contextvars import ContextVar
+from contextlib import AbstractContextManager, nullcontext
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+import queue
+import random
+import time
+from types import TracebackType
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, TRACE_BACKUP_COUNT, TRACE_MAX_BYTES
+
+DATA_TRACE_WRITER: HassKey[asyncio.Task["BonecoTraceWriter"]] = HassKey(
+    f"{DOMAIN}_trace_writer"
+)
+
+# Id of the sampled trace the current task belongs to
+_CURRENT_TRACE: ContextVar[str | None] = ContextVar("boneco_trace", default=None)
+_NOT_SAMPLED = nullcontext()
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, separators=(",", ":"))
+
+
+class _TraceQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Spans are serialized by the listener thread, not in the event loop
+        return record
+
+
+class BonecoTraceWriter:
+    """Writes spans to a rotating file from a background thread."""
+
+    def __init__(self, path: Path) -> None:
+        """Open the file, must run in the executor."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            path,
+            maxBytes=TRACE_MAX_BYTES,
+            backupCount=TRACE_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(_JsonFormatter())
+        span_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        self._handler = _TraceQueueHandler(span_queue)
+        self._listener = QueueListener(span_queue, file_handler)
+        self._listener.start()
+
+    def write(self, span: dict[str, Any]) -> None:
+        """Queue a span for writing."""
+        self._handler.handle(logging.makeLogRecord({"msg": span}))
+
+    def stop(self) -> None:
+        """Write queued spans and close the file, must run in the executor."""
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+
+
+async def async_get_trace_writer(hass: HomeAssistant) -> BonecoTraceWriter:
+    """Return the trace writer shared by all devices."""
+    if (task := hass.data.get(DATA_TRACE_WRITER)) is None:
+        task = hass.data[DATA_TRACE_WRITER] = hass.async_create_task(
+            _async_create_trace_writer(hass), f"{DOMAIN} trace writer"
+        )
+    return await task
+
+
+async def _async_create_trace_writer(hass: HomeAssistant) -> BonecoTraceWriter:
+    writer = await hass.async_add_executor_job(
+        BonecoTraceWriter, Path(hass.config.path(DOMAIN, "traces.jsonl"))
+    )
+
+    async def async_stop(_event: Event) -> None:
+        await hass.async_add_executor_job(writer.stop)
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop)
+    return writer
+
+
+class _Span:
+    """Times a block and writes it as a span of the current trace."""
+
+    __slots__ = (
+        "_attrs",
+        "_name",
+        "_started",
+        "_timestamp",
+        "_token",
+        "_trace_id",
+        "_tracer",
+    )
+
+    def __init__(
+        self, tracer: "BonecoTracer", name: str, trace_id: str, attrs: dict[str, Any]
+    ) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._trace_id = trace_id
+        self._attrs = attrs
+        self._started = 0.0
+        self._timestamp = 0.0
+
+    def __enter__(self) -> None:
+        self._token = _CURRENT_TRACE.set(self._trace_id)
+        self._timestamp = time.time()
+        self._started = time.monotonic()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        duration = time.monotonic() - self._started
+        _CURRENT_TRACE.reset(self._token)
+        span: dict[str, Any] = {
+            "ts": round(self._timestamp, 3),
+            "trace": self._trace_id,
+            "span": self._name,
+            "device": self._tracer.device,
+            "duration": round(duration, 4),
+            **self._attrs,
+        }
+        if exc_type is None:
+            span["outcome"] = "ok"
+        elif issubclass(exc_type, TimeoutError):
+            span["outcome"] = "timeout"
+        else:
+            span["outcome"] = "error"
+            span["error"] = exc_type.__name__
+        self._tracer.writer.write(span)
+
+
+class BonecoTracer:
+    """Creates spans of device operations for a sample of traces.
+
+    An operation like a poll or a write starts a trace, requests made during
+    it are its spans. Spans of traces which are not sampled cost nothing.
+    """
+
+    def __init__(
+        self, device: str, writer: BonecoTraceWriter | None = None, rate: float = 0
+    ) -> None:
+        """Initialize the tracer, without a writer nothing is traced."""
+        self.device = device
+        self.writer = writer
+        self.rate = rate if writer is not None else 0
+
+    def trace(self, name: str, **attrs: Any) -> AbstractContextManager[None]:
+        """Start a trace if it is sampled, or a span of the current trace."""
+        if _CURRENT_TRACE.get() is not None:
+            return self.span(name, **attrs)
+        if not self.rate or random.random() >= self.rate:
+            return _NOT_SAMPLED
+        return _Span(self, name, f"{random.getrandbits(64):016x}", attrs)
+
+    def span(self, name: str, **attrs: Any) -> AbstractContextManager[None]:
+        """Time a request as part of the current trace, if it is sampled."""
+        if (trace_id := _CURRENT_TRACE.get()) is None:
+            return _NOT_SAMPLED
+        return _Span(self, name, trace_id, attrs)
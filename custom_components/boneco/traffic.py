@@ -0,0 +1,236 @@
+"""Recording and replay of Boneco device traffic."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import gzip
+import json
+from pathlib import Path
+import time
+from typing import Any
+
+from pyboneco import (
+    BonecoAuth,
+    BonecoAuthState,
+    BonecoClient,
+    BonecoDeviceInfo,
+    BonecoDeviceState,
+)
+from pyboneco.constants import (
+    CHARACTERISTIC_DEVICE_INFO,
+    CHARACTERISTIC_DEVICE_NAME,
+    CHARACTERISTIC_DEVICE_STATE,
+)
+
+TRAFFIC_FORMAT_VERSION = 1
+
+# Only these payloads are stored, auth traffic is derived from the device key
+RECORDED_CHARACTERISTICS = {
+    CHARACTERISTIC_DEVICE_INFO,
+    CHARACTERISTIC_DEVICE_NAME,
+    CHARACTERISTIC_DEVICE_STATE,
+}
+
+
+class BonecoTrafficRecorder:
+    """Collects device requests with their timings."""
+
+    def __init__(self, auth_data: BonecoAuth) -> None:
+        """Initialize the recorder."""
+        self.header = {
+            "version": TRAFFIC_FORMAT_VERSION,
+            "model": auth_data.name,
+            "started": time.time(),
+        }
+        self.events: list[dict[str, Any]] = []
+        self._started = time.monotonic()
+
+    @asynccontextmanager
+    async def record(
+        self, op: str, uuid: str | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Time a request, the yielded event can be extended with its data."""
+        started = time.monotonic()
+        event: dict[str, Any] = {"t": round(started - self._started, 4), "op": op}
+        if uuid is not None:
+            event["uuid"] = uuid
+        try:
+            yield event
+        except BaseException as err:
+            event["error"] = type(err).__name__
+            raise
+        finally:
+            event["duration"] = round(time.monotonic() - started, 4)
+            self.events.append(event)
+
+    def save(self, path: Path) -> None:
+        """Write the recording as gzipped JSON lines, one event per line."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            for line in (self.header, *self.events):
+                file.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+
+class _RecordingBleakClient:
+    """Proxy of a bleak client which records characteristic access."""
+
+    def __init__(self, client: Any, recorder: BonecoTrafficRecorder) -> None:
+        self._client = client
+        self._recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    async def read_gatt_char(self, char: Any, **kwargs: Any) -> bytearray:
+        uuid = str(char)
+        async with self._recorder.record("read", uuid) as event:
+            data = await self._client.read_gatt_char(char, **kwargs)
+            if uuid in RECORDED_CHARACTERISTICS:
+                event["data"] = bytes(data).hex()
+            return data
+
+    async def write_gatt_char(self, char: Any, data: bytes, **kwargs: Any) -> None:
+        uuid = str(char)
+        async with self._recorder.record("write", uuid) as event:
+            if uuid in RECORDED_CHARACTERISTICS:
+                event["data"] = bytes(data).hex()
+            await self._client.write_gatt_char(char, data, **kwargs)
+
+
+class BonecoRecordingClient(BonecoClient):
+    """Device client which records all traffic with its timings."""
+
+    def __init__(self, auth_data: BonecoAuth, recorder: BonecoTrafficRecorder) -> None:
+        """Initialize the client."""
+        super().__init__(auth_data)
+        self._recorder = recorder
+
+    async def connect(self) -> None:
+        """Connect and record how long it took."""
+        if self.is_connected:
+            return
+        async with self._recorder.record("connect"):
+            await super().connect()
+        self._client = _RecordingBleakClient(self._client, self._recorder)
+
+    async def disconnect(self) -> None:
+        """Disconnect and record how long it took."""
+        async with self._recorder.record("disconnect"):
+            await super().disconnect()
+
+    async def authorize(self) -> None:
+        """Authorize and record how long it took."""
+        async with self._recorder.record("auth"):
+            await super().authorize()
+
+
+class BonecoTrafficRecording:
+    """Recorded traffic of a device, loaded for replay."""
+
+    def __init__(self, header: dict[str, Any], events: list[dict[str, Any]]) -> None:
+        """Initialize the recording."""
+        self.header = header
+        self.events = events
+
+    @classmethod
+    def load(cls, path: Path) -> BonecoTrafficRecording:
+        """Load a recording written by BonecoTrafficRecorder."""
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            header, *events = (json.loads(line) for line in file)
+        if header.get("version") != TRAFFIC_FORMAT_VERSION:
+            raise ValueError(f"Unsupported traffic format {header.get('version')}")
+        return cls(header, events)
+
+
+class BonecoReplayClient:
+    """Stand-in for BonecoClient which answers from a recording.
+
+    Requests of each kind are answered in recorded order with the recorded
+    latency and errors, and start over when the recording is exhausted.
+    Written states are kept, so later reads return them like a device would.
+    """
+
+    def __init__(
+        self,
+        auth_data: BonecoAuth,
+        recording: BonecoTrafficRecording,
+        speed: float = 1.0,
+    ) -> None:
+        """Initialize the client."""
+        self._auth_data = auth_data
+        self._speed = speed
+        self._connected = False
+        self._written_state: bytes | None = None
+        self._events: dict[tuple[str, str | None], deque[dict[str, Any]]] = defaultdict(
+            deque
+        )
+        for event in recording.events:
+            self._events[event["op"], event.get("uuid")].append(event)
+
+    @property
+    def is_connected(self) -> bool:
+        """Return true if the replayed connection is open."""
+        return self._connected
+
+    async def _async_replay(self, op: str, uuid: str | None = None) -> bytes | None:
+        events = self._events.get((op, uuid))
+        if not events:
+            return None
+        event = events[0]
+        events.rotate(-1)
+        await asyncio.sleep(event["duration"] / self._speed)
+        if error := event.get("error"):
+            if error in ("TimeoutError", "CancelledError"):
+                raise TimeoutError
+            raise ConnectionError(f"Replayed {error}")
+        return bytes.fromhex(event["data"]) if "data" in event else None
+
+    async def connect(self) -> None:
+        """Replay a connection attempt."""
+        if not self._connected:
+            await self._async_replay("connect")
+            self._connected = True
+
+    async def disconnect(self) -> None:
+        """Replay a disconnect."""
+        if self._connected:
+            self._connected = False
+            await self._async_replay("disconnect")
+        self._auth_data.reset_state()
+
+    async def authorize(self) -> None:
+        """Replay authorization."""
+        await self._async_replay("auth")
+        self._auth_data._set_state(BonecoAuthState.AUTH_SUCCESS)
+
+    async def _async_read(self, uuid: str) -> bytes:
+        await self.connect()
+        if self._auth_data.current_state != BonecoAuthState.AUTH_SUCCESS:
+            await self.authorize()
+        data = await self._async_replay("read", uuid)
+        if data is None:
+            raise ConnectionError(f"Nothing recorded for {uuid}")
+        return data
+
+    async def get_state(self) -> BonecoDeviceState:
+        """Return the last written or the next recorded state."""
+        data = await self._async_read(CHARACTERISTIC_DEVICE_STATE)
+        return BonecoDeviceState(self._auth_data.name, self._written_state or data)
+
+    async def set_state(self, state: BonecoDeviceState) -> None:
+        """Replay a write and keep the state."""
+        await self.connect()
+        await self._async_replay("write", CHARACTERISTIC_DEVICE_STATE)
+        self._written_state = bytes(state.hex_value)
+
+    async def get_device_info(self) -> BonecoDeviceInfo:
+        """Return the next recorded device info."""
+        return BonecoDeviceInfo(await self._async_read(CHARACTERISTIC_DEVICE_INFO))
+
+    async def get_device_name(self) -> str:
+        """Return the next recorded device name."""
+        data = await self._async_read(CHARACTERISTIC_DEVICE_NAME)
+        return data.strip(b"\x00").decode()
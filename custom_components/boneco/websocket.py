@@ -0,0 +1,165 @@
+"""Websocket API of the Boneco integration."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import UTC, datetime
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
+from pyboneco import BonecoDeviceInfo
+
+from .const import MIN_MEASUREMENT_INTERVAL, SIGNAL_DEVICE_UPDATED
+from .coordinator import BonecoDataUpdateCoordinator
+from .models import get_measurements
+from .services import async_get_coordinators
+
+ATTR_MIN_INTERVAL = "min_interval"
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register websocket commands of the integration."""
+    websocket_api.async_register_command(hass, websocket_subscribe_measurements)
+
+
+class _MeasurementThrottle:
+    """Forwards measurements of one device at most once per interval.
+
+    Measurements arriving too early are coalesced, only the latest one is sent
+    when the interval is over.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        interval: float,
+        send: Callable[[dict[str, Any]], None],
+    ) -> None:
+        """Initialize the throttle."""
+        self._hass = hass
+        self._interval = interval
+        self._send = send
+        self._last_sent = -interval
+        self._pending: dict[str, Any] | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_handle(self, timestamp: float, info: BonecoDeviceInfo) -> None:
+        """Send the measurement now or once the interval is over."""
+        self._pending = {
+            "time": datetime.fromtimestamp(timestamp, UTC).isoformat(),
+            **get_measurements(info),
+        }
+        if self._unsub_timer is not None:
+            return
+        delay = self._last_sent + self._interval - time.monotonic()
+        if delay <= 0:
+            self._async_flush()
+        else:
+            self._unsub_timer = async_call_later(self._hass, delay, self._async_flush)
+
+    @callback
+    def _async_flush(self, _now: datetime | None = None) -> None:
+        self._unsub_timer = None
+        if self._pending is None:
+            return
+        self._last_sent = time.monotonic()
+        self._send(self._pending)
+        self._pending = None
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop pending measurements."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "boneco/subscribe_measurements",
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_MIN_INTERVAL, default=MIN_MEASUREMENT_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=MIN_MEASUREMENT_INTERVAL)
+        ),
+    }
+)
+@callback
+def websocket_subscribe_measurements(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream measurements of devices as they are read.
+
+    Reloaded devices get a new coordinator, the subscription follows it once
+    the device has been polled again.
+    """
+    try:
+        coordinators = async_get_coordinators(hass, msg[ATTR_DEVICE_ID])
+    except ServiceValidationError as err:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, str(err))
+        return
+
+    # Keyed by config entry, which stays the same when the device is reloaded
+    throttles: dict[str, _MeasurementThrottle] = {}
+    attached: dict[str, BonecoDataUpdateCoordinator] = {}
+    unsubs: dict[str, CALLBACK_TYPE] = {}
+
+    @callback
+    def attach(entry_id: str, coordinator: BonecoDataUpdateCoordinator | None) -> None:
+        if entry_id not in throttles or attached.get(entry_id) is coordinator:
+            return
+        if (unsub := unsubs.pop(entry_id, None)) is not None:
+            unsub()
+            del attached[entry_id]
+        if coordinator is None:
+            return
+        throttle = throttles[entry_id]
+        attached[entry_id] = coordinator
+        unsubs[entry_id] = coordinator.async_add_measurement_listener(
+            throttle.async_handle
+        )
+        if coordinator.data is not None:
+            throttle.async_handle(time.time(), coordinator.data.info)
+
+    unsub_updates = async_dispatcher_connect(hass, SIGNAL_DEVICE_UPDATED, attach)
+
+    @callback
+    def unsubscribe() -> None:
+        unsub_updates()
+        for unsub in unsubs.values():
+            unsub()
+        for throttle in throttles.values():
+            throttle.async_cancel()
+
+    def send_measurements(device_id: str) -> Callable[[dict[str, Any]], None]:
+        @callback
+        def send(measurements: dict[str, Any]) -> None:
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"], {ATTR_DEVICE_ID: device_id, **measurements}
+                )
+            )
+
+        return send
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+
+    for device_id, coordinator in coordinators.items():
+        entry_id = coordinator.config_entry.entry_id
+        throttles[entry_id] = _MeasurementThrottle(
+            hass, msg[ATTR_MIN_INTERVAL], send_measurements(device_id)
+        )
+        attach(entry_id, coordinator)
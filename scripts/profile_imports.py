@@ -0,0 +1,111 @@
+"""Measure import time of every module of the Boneco integration.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` after
+the Home Assistant modules which are always loaded before the integration.
+The reported time is therefore what the module adds to startup. Modules
+which are loaded when Home Assistant starts must stay within a budget, CI
+runs this script to enforce it. Every module is imported several times and
+the fastest run counts, so a busy machine doesn't fail the check.
+
+    python scripts/profile_imports.py
+    python scripts/profile_imports.py --max-ms 150 --runs 10
+"""
+
+import argparse
+from pathlib import Path
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = "custom_components.boneco"
+
+# Loaded by Home Assistant before any module of the integration
+PRELOAD = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.components.bluetooth",
+)
+
+# Milliseconds a module may add to startup
+DEFAULT_MAX_MS = 200.0
+DEFAULT_RUNS = 5
+
+# Imported on demand only, so they are reported but not held to the budget
+LAZY_MODULES = {f"{PACKAGE}.profiler"}
+
+
+def profile_module(module: str) -> tuple[float, list[tuple[float, str]]]:
+    """Return cumulative milliseconds of the module and its heaviest imports."""
+    code = f"import {', '.join(PRELOAD)}; import sys; sys.stderr.write('---\\n'); import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    _, _, measured = result.stderr.partition("---\n")
+    total = 0.0
+    imports: list[tuple[float, str]] = []
+    for line in measured.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (
+            part.strip() for part in line.removeprefix("import time:").split("|", 2)
+        )
+        if not self_us.isdigit():
+            continue
+        imports.append((int(self_us) / 1000, name))
+        if name == module:
+            total = int(cumulative_us) / 1000
+    imports.sort(reverse=True)
+    return total, imports
+
+
+def main() -> int:
+    """Print the import profile and check it against the budget."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=DEFAULT_MAX_MS,
+        help="fail if importing any module takes longer than this "
+        f"(default {DEFAULT_MAX_MS:g})",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_RUNS,
+        help=f"imports of every module, the fastest counts (default {DEFAULT_RUNS})",
+    )
+    parser.add_argument(
+        "--top", type=int, default=5, help="number of heaviest imports to show"
+    )
+    args = parser.parse_args()
+
+    modules = sorted(
+        f"{PACKAGE}.{path.stem}"
+        for path in (ROOT / PACKAGE.replace(".", "/")).glob("*.py")
+        if path.stem != "__init__"
+    )
+    slow: list[str] = []
+    for module in [PACKAGE, *modules]:
+        total, imports = min(
+            (profile_module(module) for _ in range(args.runs)),
+            key=lambda run: run[0],
+        )
+        print(f"{module}: {total:.1f} ms")
+        for self_ms, name in imports[: args.top]:
+            print(f"    {self_ms:8.1f} ms  {name}")
+        if module not in LAZY_MODULES and total > args.max_ms:
+            slow.append(module)
+
+    if slow:
+        print(f"Over {args.max_ms} ms: {', '.join(slow)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Replay recorded Boneco traffic through the integration to benchmark it offline.
+
+Loads a recording of the ``boneco.record_traffic`` action and runs polls and
+writes of a BonecoDataUpdateCoordinator against it, in a Home Assistant
+instance of the test framework. The coordinator talks to a
+BonecoReplayClient instead of the device: every request takes its recorded
+latency and fails with its recorded error, so the effect of pipelined reads
+or of the profiles can be compared without a device.
+
+    uv run --with pytest-homeassistant-custom-component python \\
+        scripts/replay_traffic.py boneco/traffic/AABBCCDDEEFF_1700000000.jsonl.gz
+    ... replay_traffic.py recording.jsonl.gz --polls 50 --speed 10 --pipelined
+"""
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import math
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any
+
+from bleak.backends.device import BLEDevice
+from pyboneco import SUPPORTED_DEVICE_CLASSES_BY_MODEL, BonecoAuth
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from homeassistant.const import CONF_ADDRESS, CONF_PASSWORD, CONF_SENSOR_TYPE
+from homeassistant.core import HomeAssistant
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.boneco.const import (  # noqa: E402
+    CONF_PIPELINED_READS,
+    CONF_PROFILE,
+    DEFAULT_PROFILE,
+    DOMAIN,
+)
+from custom_components.boneco.coordinator import (  # noqa: E402
+    BonecoDataUpdateCoordinator,
+)
+from custom_components.boneco.models import PROFILES  # noqa: E402
+from custom_components.boneco.traffic import (  # noqa: E402
+    BonecoReplayClient,
+    BonecoTrafficRecording,
+)
+
+REPLAY_ADDRESS = "00:00:00:00:00:01"
+
+
+@dataclass
+class ReplayResult:
+    """Unscaled durations of successful operations and the failure counts."""
+
+    durations: dict[str, list[float]] = field(
+        default_factory=lambda: {"poll": [], "write": []}
+    )
+    failures: dict[str, int] = field(default_factory=lambda: {"poll": 0, "write": 0})
+
+
+def create_replay_coordinator(
+    hass: HomeAssistant,
+    recording: BonecoTrafficRecording,
+    options: dict[str, Any] | None = None,
+    speed: float = 1.0,
+) -> BonecoDataUpdateCoordinator:
+    """Create a coordinator of a device entry which talks to the recording."""
+    model = recording.header["model"]
+    device_class = SUPPORTED_DEVICE_CLASSES_BY_MODEL[model]
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=model,
+        unique_id=REPLAY_ADDRESS,
+        data={
+            CONF_ADDRESS: REPLAY_ADDRESS,
+            CONF_PASSWORD: "",
+            CONF_SENSOR_TYPE: device_class,
+        },
+        options=options or {},
+    )
+    entry.add_to_hass(hass)
+    auth_data = BonecoAuth(BLEDevice(REPLAY_ADDRESS, model, None), "")
+    return BonecoDataUpdateCoordinator(
+        hass,
+        entry,
+        auth_data,
+        device_class,
+        client=BonecoReplayClient(auth_data, recording, speed=speed),
+    )
+
+
+async def async_replay(
+    coordinator: BonecoDataUpdateCoordinator,
+    polls: int,
+    write_every: int = 0,
+    speed: float = 1.0,
+) -> ReplayResult:
+    """Poll the given number of times, toggling the child lock now and then.
+
+    Every write is followed by the refresh the coordinator requests after it.
+    """
+    result = ReplayResult()
+    for index in range(polls):
+        started = time.perf_counter()
+        await coordinator.async_refresh()
+        if coordinator.last_update_success:
+            result.durations["poll"].append((time.perf_counter() - started) * speed)
+        else:
+            result.failures["poll"] += 1
+        if not write_every or (index + 1) % write_every:
+            continue
+        started = time.perf_counter()
+        try:
+            await coordinator.async_apply_state(_toggle_lock)
+        except Exception:
+            result.failures["write"] += 1
+        else:
+            result.durations["write"].append((time.perf_counter() - started) * speed)
+        # The refresh requested by the write isn't part of its duration
+        await coordinator.hass.async_block_till_done()
+    return result
+
+
+def _toggle_lock(state: Any) -> None:
+    state.is_locked = not state.is_locked
+
+
+async def _async_main(args: argparse.Namespace) -> int:
+    recording = BonecoTrafficRecording.load(args.recording)
+    options = {CONF_PROFILE: args.profile, CONF_PIPELINED_READS: args.pipelined}
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            coordinator = create_replay_coordinator(
+                hass, recording, options, args.speed
+            )
+            result = await async_replay(
+                coordinator, args.polls, args.write_every, args.speed
+            )
+            await coordinator.async_shutdown()
+
+    print(
+        f"{recording.header['model']}, {len(recording.events)} recorded requests, "
+        f"{args.profile} profile, "
+        f"{'pipelined' if args.pipelined else 'sequential'} reads"
+    )
+    for name, values in result.durations.items():
+        if not values and not result.failures[name]:
+            continue
+        summary = f"{name}: {len(values)} ok, {result.failures[name]} failed"
+        if values:
+            values.sort()
+            p90 = values[max(math.ceil(0.9 * len(values)), 1) - 1]
+            summary += f", mean {statistics.fmean(values):.3f}s, p90 {p90:.3f}s"
+        print(summary)
+    return 0
+
+
+def main() -> int:
+    """Replay a recording."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", type=Path, help="recorded .jsonl.gz file")
+    parser.add_argument("--polls", type=int, default=20, help="number of polls")
+    parser.add_argument(
+        "--write-every", type=int, default=5, help="write after every n polls, 0 never"
+    )
+    parser.add_argument(
+        "--pipelined", action="store_true", help="issue the reads concurrently"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=sorted(PROFILES),
+        default=DEFAULT_PROFILE,
+        help="performance profile of the device",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="replay faster by this factor, durations are reported unscaled",
+    )
+    return asyncio.run(_async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,397 @@
+"""Virtual Boneco peripheral for running pyboneco without hardware.
+
+The peripheral emulates the GATT characteristics of a device: the auth
+handshake with nonce, challenge responses and pairing confirmation, device
+info and name, and the state characteristic which keeps written values.
+pyboneco talks to it through its regular client code, so encoding, auth and
+state handling are exercised exactly as with a real device.
+
+Pairs, authorizes, polls and writes one device of every device class:
+
+    python scripts/virtual_boneco.py --latency 30
+
+VirtualBonecoClient can also be passed as ``client`` to
+BonecoDataUpdateCoordinator to run the integration against the emulator,
+as tests/test_coordinator.py does.
+"""
+
+import argparse
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+import os
+import time
+from typing import Any
+
+from bleak.backends.device import BLEDevice
+from cryptography.hazmat.primitives.ciphers import Cipher
+from cryptography.hazmat.primitives.ciphers.algorithms import AES
+from cryptography.hazmat.primitives.ciphers.modes import ECB
+from pyboneco import (
+    BonecoAuth,
+    BonecoAuthState,
+    BonecoClient,
+    BonecoDeviceClass,
+    BonecoDeviceState,
+)
+from pyboneco.constants import (
+    CHARACTERISTIC_AUTH,
+    CHARACTERISTIC_AUTH_AND_SERVICE,
+    CHARACTERISTIC_DEVICE_INFO,
+    CHARACTERISTIC_DEVICE_NAME,
+    CHARACTERISTIC_DEVICE_STATE,
+    SUPPORTED_DEVICES,
+    SUPPORTED_DEVICES_BY_TYPE,
+)
+from pyboneco.device import BonecoDevice
+
+RESET_DATE_BYTES = BonecoDeviceState.RESET_DATE_BYTES
+
+# One model of every device class
+MODELS = {
+    BonecoDeviceClass.FAN: "F225",
+    BonecoDeviceClass.HUMIDIFIER: "W400",
+    BonecoDeviceClass.SIMPLE_CLIMATE: "H400",
+    BonecoDeviceClass.TOP_CLIMATE: "H700",
+}
+
+# Keys of the app for the pairing level, the device key is used for level 1
+PAIRING_KEY = b"\x00\x00\x01\x02\x01\x02\x01\x02\x01\x02\x01\x02\x01\x02\x01\x02"
+PAIRING_LEVEL = 15
+
+
+@dataclass(frozen=True)
+class _Characteristic:
+    uuid: str
+
+
+def _aes_decrypt(key: bytes, data: bytes) -> bytes:
+    decryptor = Cipher(AES(key), ECB()).decryptor()
+    return decryptor.update(data) + decryptor.finalize()
+
+
+def _initial_info(device: BonecoDevice) -> bytes:
+    particles = (600).to_bytes(2, "little") if device.particle_sensor else b"\xff\xff"
+    voc = (120).to_bytes(2, "little") if device.particle_sensor else b"\xff\xff"
+    return (
+        bytes([device.device_type, 0, 22, 45])
+        + particles
+        + voc
+        + (123456).to_bytes(6, "little")
+        + (1).to_bytes(2, "little")
+        + bytes([0x10, 0x01, 0x10])
+    )
+
+
+def _initial_state(device: BonecoDevice) -> bytes:
+    if device.device_class == BonecoDeviceClass.FAN:
+        fan_byte = 10
+    else:
+        operating_mode = next(
+            mode for mode, config in device.operating_modes.items() if config
+        )
+        fan_byte = (2 << 4) | operating_mode
+    if _has_service_counter(device):
+        # Minutes since the last service
+        reminder = (1440).to_bytes(4, "little")
+    else:
+        # Timestamp of the next service
+        reminder = int(time.time() + 30 * 86400).to_bytes(4, "little")
+    return bytes([fan_byte, 1 << 3, 50, 0]) + reminder * 3 + bytes([0, 0, 10, 100])
+
+
+def _has_service_counter(device: BonecoDevice) -> bool:
+    return device.device_class == BonecoDeviceClass.TOP_CLIMATE
+
+
+def _written_state(device: BonecoDevice, current: bytes, data: bytes) -> bytes:
+    """Apply a state write the way the device firmware does."""
+    if not _has_service_counter(device):
+        return data
+    # Service counters can only be reset, anything else keeps them running
+    reminders = b"".join(
+        bytes(4) if new == RESET_DATE_BYTES else old
+        for old, new in (
+            (current[offset : offset + 4], data[offset : offset + 4])
+            for offset in (4, 8, 12)
+        )
+    )
+    return data[:4] + reminders + data[16:]
+
+
+class VirtualBonecoPeripheral:
+    """Emulated GATT server of a Boneco device.
+
+    Implements the part of the bleak client interface which pyboneco uses.
+    Every request and notification is delayed by the given latency.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        name: str = "Virtual Boneco",
+        latency: float = 0.0,
+        confirm_delay: float = 0.5,
+    ) -> None:
+        """Initialize the peripheral in pairing mode."""
+        # H400 shares its type with H500 and is read back as H500, so models
+        # are emulated with a type which resolves to the same product, e.g.
+        # H400 as H400 CN
+        product_id = next(
+            d.product_id for d in SUPPORTED_DEVICES if d.product_name == model
+        )
+        self.device = min(
+            (
+                d
+                for d in SUPPORTED_DEVICES
+                if d.product_id == product_id
+                and SUPPORTED_DEVICES_BY_TYPE[d.device_type] is d
+            ),
+            key=lambda d: d.product_name != model,
+        )
+        self.device_key = os.urandom(16)
+        self.pairing_active = True
+        self.latency = latency
+        self.confirm_delay = confirm_delay
+        self.requests = 0
+        self._connected = False
+        self._authorized = False
+        self._nonce = b""
+        self._callbacks: dict[str, Callable[[Any, bytearray], None]] = {}
+        self._values = {
+            CHARACTERISTIC_DEVICE_NAME: name.encode().ljust(20, b"\x00"),
+            CHARACTERISTIC_DEVICE_INFO: _initial_info(self.device),
+            CHARACTERISTIC_DEVICE_STATE: _initial_state(self.device),
+        }
+
+    @property
+    def is_connected(self) -> bool:
+        """Return true if a client is connected."""
+        return self._connected
+
+    async def connect(self, **kwargs: Any) -> bool:
+        """Accept a connection."""
+        await self._async_round_trip()
+        self._connected = True
+        return True
+
+    async def disconnect(self) -> bool:
+        """Drop the connection and the session."""
+        self._connected = False
+        self._authorized = False
+        self._callbacks.clear()
+        return True
+
+    async def read_gatt_char(self, char: str, **kwargs: Any) -> bytearray:
+        """Return the value of a characteristic."""
+        await self._async_round_trip()
+        if char != CHARACTERISTIC_DEVICE_NAME:
+            self._check_authorized()
+        return bytearray(self._values[char])
+
+    async def write_gatt_char(self, char: str, data: bytes, **kwargs: Any) -> None:
+        """Handle a write to a characteristic."""
+        await self._async_round_trip()
+        if char == CHARACTERISTIC_AUTH:
+            self._handle_auth(bytes(data))
+        elif char == CHARACTERISTIC_DEVICE_STATE:
+            self._check_authorized()
+            self._values[char] = _written_state(self.device, self._values[char], data)
+        else:
+            raise ValueError(f"Characteristic {char} is not writable")
+
+    async def start_notify(
+        self, char: str, callback: Callable[[Any, bytearray], None], **kwargs: Any
+    ) -> None:
+        """Subscribe to a characteristic, auth starts with a fresh nonce."""
+        await self._async_round_trip()
+        self._callbacks[char] = callback
+        if char == CHARACTERISTIC_AUTH:
+            self._nonce = b"\x01\x00" + os.urandom(16) + b"\x00\x00"
+            self._notify(CHARACTERISTIC_AUTH, self._nonce)
+
+    async def stop_notify(self, char: str) -> None:
+        """Unsubscribe from a characteristic."""
+        await self._async_round_trip()
+        self._callbacks.pop(char, None)
+
+    def _handle_auth(self, data: bytes) -> None:
+        match data[0]:
+            case 3:
+                self._handle_challenge_response(data[1], data[2:18])
+            case 5:
+                # Key request after the user confirmed pairing on the device
+                self._notify(
+                    CHARACTERISTIC_AUTH, b"\x06\x00\x00" + self.device_key + b"\x00"
+                )
+            case _:
+                raise ValueError(f"Unknown auth request {data.hex()}")
+
+    def _handle_challenge_response(self, level: int, response: bytes) -> None:
+        challenge = self._nonce[2:17]
+        if level == 0 and self.pairing_active:
+            valid = _aes_decrypt(PAIRING_KEY, response) == challenge + bytes(
+                [PAIRING_LEVEL]
+            )
+        elif level == 1:
+            valid = _aes_decrypt(self.device_key, response) == challenge + b"\x01"
+        else:
+            valid = False
+        self._notify(
+            CHARACTERISTIC_AUTH, bytes([4, level, 2 if valid else 0]) + bytes(17)
+        )
+        if not valid:
+            return
+        if level == 1:
+            self._authorized = True
+        else:
+            # Emulates the user pressing the power button to confirm
+            asyncio.get_running_loop().call_later(
+                self.confirm_delay,
+                self._notify,
+                CHARACTERISTIC_AUTH_AND_SERVICE,
+                bytes([0xC4, 1]),
+            )
+
+    def _notify(self, char: str, data: bytes) -> None:
+        def deliver() -> None:
+            if callback := self._callbacks.get(char):
+                callback(_Characteristic(char), bytearray(data))
+
+        asyncio.get_running_loop().call_later(self.latency, deliver)
+
+    def _check_authorized(self) -> None:
+        if not self._connected:
+            raise ConnectionError("Not connected")
+        if not self._authorized:
+            raise PermissionError("Not authorized")
+
+    async def _async_round_trip(self) -> None:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+
+
+class VirtualBonecoClient(BonecoClient):
+    """pyboneco client which talks to a virtual peripheral instead of bleak."""
+
+    def __init__(
+        self, auth_data: BonecoAuth, peripheral: VirtualBonecoPeripheral
+    ) -> None:
+        """Initialize the client."""
+        self._auth_data = auth_data
+        self._client = peripheral
+
+    async def connect(self) -> None:
+        """Connect to the peripheral."""
+        if not self.is_connected:
+            await self._client.connect()
+
+
+def _new_auth(device: BLEDevice, key: str = "") -> BonecoAuth:
+    auth_data = BonecoAuth(device, key)
+    # pyboneco shares one auth event between all devices
+    auth_data._state_changed = asyncio.Event()
+    return auth_data
+
+
+async def _async_run_device(
+    index: int, model: str, latency: float
+) -> dict[str, float | int]:
+    peripheral = VirtualBonecoPeripheral(model, latency=latency)
+    device = BLEDevice(f"00:00:00:00:00:{index:02X}", model, None)
+    timings: dict[str, float | int] = {}
+
+    auth_data = _new_auth(device)
+    client = VirtualBonecoClient(auth_data, peripheral)
+    started = time.perf_counter()
+    await client.connect()
+    await client.authorize()
+    timings["pairing"] = time.perf_counter() - started
+    if auth_data.current_state != BonecoAuthState.AUTH_SUCCESS:
+        raise RuntimeError(f"{model}: pairing failed")
+    key = auth_data.save()["key"]
+    await client.disconnect()
+
+    auth_data = _new_auth(device, key)
+    client = VirtualBonecoClient(auth_data, peripheral)
+    started = time.perf_counter()
+    await client.connect()
+    await client.authorize()
+    timings["connect_auth"] = time.perf_counter() - started
+    if auth_data.current_state != BonecoAuthState.AUTH_SUCCESS:
+        raise RuntimeError(f"{model}: authorization with the device key failed")
+
+    started = time.perf_counter()
+    await client.get_device_name()
+    await client.get_device_info()
+    state = await client.get_state()
+    timings["sequential_reads"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        client.get_device_name(), client.get_device_info(), client.get_state()
+    )
+    timings["pipelined_reads"] = time.perf_counter() - started
+
+    state.is_enabled = not state.is_enabled
+    if state.has_service_operating_counter:
+        # pyboneco can't encode a state with running service counters, so
+        # write them reset like the reset buttons of the integration do
+        state.set_reminder_filter_date(None)
+        state.set_reminder_iss_date(None)
+        state.set_reminder_clean_date(None)
+    started = time.perf_counter()
+    await client.set_state(state)
+    timings["write"] = time.perf_counter() - started
+    if (await client.get_state()).is_enabled != state.is_enabled:
+        raise RuntimeError(f"{model}: written state was not read back")
+
+    await client.disconnect()
+    timings["requests"] = peripheral.requests
+    return timings
+
+
+async def _async_main(models: list[str], latency: float) -> int:
+    results = await asyncio.gather(
+        *(
+            _async_run_device(index, model, latency)
+            for index, model in enumerate(models, start=1)
+        ),
+        return_exceptions=True,
+    )
+    failed = 0
+    for model, timings in zip(models, results, strict=True):
+        if isinstance(timings, BaseException):
+            failed += 1
+            print(f"{model}: failed, {timings!r}")
+            continue
+        print(
+            f"{model}: "
+            + ", ".join(
+                f"{key}={value}" if isinstance(value, int) else f"{key}={value:.3f}s"
+                for key, value in timings.items()
+            )
+        )
+    return 1 if failed else 0
+
+
+def main() -> int:
+    """Run all virtual devices."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--latency", type=float, default=0, help="round trip latency in milliseconds"
+    )
+    parser.add_argument(
+        "--model",
+        action="append",
+        choices=sorted({d.product_name for d in SUPPORTED_DEVICES}),
+        help="model to emulate, one of every device class by default",
+    )
+    args = parser.parse_args()
+    return asyncio.run(
+        _async_main(args.model or list(MODELS.values()), args.latency / 1000)
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+"""Tests for the Boneco integration."""
+
+from collections.abc import Callable
+from typing import Any
+
+from bleak.backends.device import BLEDevice
+from pyboneco import SUPPORTED_DEVICE_CLASSES_BY_MODEL, BonecoAuth, BonecoClient
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from virtual_boneco import VirtualBonecoClient, VirtualBonecoPeripheral
+
+from custom_components.boneco.const import DOMAIN
+from custom_components.boneco.coordinator import BonecoDataUpdateCoordinator
+from homeassistant.const import CONF_ADDRESS, CONF_PASSWORD, CONF_SENSOR_TYPE
+from homeassistant.core import HomeAssistant
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+
+
+def create_entry(
+    hass: HomeAssistant, model: str, key: str, options: dict[str, Any] | None = None
+) -> MockConfigEntry:
+    """Create a device entry of the given model."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=model,
+        unique_id=ADDRESS,
+        data={
+            CONF_ADDRESS: ADDRESS,
+            CONF_PASSWORD: key,
+            CONF_SENSOR_TYPE: SUPPORTED_DEVICE_CLASSES_BY_MODEL[model],
+        },
+        options=options or {},
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+def create_coordinator(
+    hass: HomeAssistant,
+    entry: MockConfigEntry,
+    client_factory: Callable[[BonecoAuth], BonecoClient],
+) -> BonecoDataUpdateCoordinator:
+    """Create a coordinator of the entry which talks to the given client."""
+    auth_data = BonecoAuth(
+        BLEDevice(ADDRESS, entry.title, None), entry.data[CONF_PASSWORD]
+    )
+    coordinator = entry.runtime_data = BonecoDataUpdateCoordinator(
+        hass,
+        entry,
+        auth_data,
+        entry.data[CONF_SENSOR_TYPE],
+        client=client_factory(auth_data),
+    )
+    coordinator.platforms = []
+    return coordinator
+
+
+def create_virtual_device(
+    hass: HomeAssistant,
+    model: str,
+    entry: MockConfigEntry | None = None,
+    **options: Any,
+) -> tuple[BonecoDataUpdateCoordinator, VirtualBonecoPeripheral]:
+    """Create a coordinator of a paired device emulator."""
+    peripheral = VirtualBonecoPeripheral(model, name=f"Virtual {model}")
+    peripheral.pairing_active = False
+    if entry is None:
+        entry = create_entry(hass, model, peripheral.device_key.hex(), options)
+    else:
+        peripheral.device_key = bytes.fromhex(entry.data[CONF_PASSWORD])
+    coordinator = create_coordinator(
+        hass, entry, lambda auth_data: VirtualBonecoClient(auth_data, peripheral)
+    )
+    return coordinator, peripheral
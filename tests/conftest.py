@@ -0,0 +1,8 @@
+"""Fixtures for the Boneco tests."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable the integration in every test."""
@@ -0,0 +1,72 @@
+"""Tests for burst sampling of Boneco measurements."""
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from custom_components.boneco.const import DOMAIN
+from custom_components.boneco.models import get_measurements
+from custom_components.boneco.services import SERVICE_START_BURST, async_setup_services
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+
+from . import create_virtual_device
+
+
+@pytest.mark.parametrize(("model", "has_pm25"), [("W400", False), ("H700", True)])
+async def test_burst_measurements(
+    hass: HomeAssistant, model: str, has_pm25: bool
+) -> None:
+    """Test devices without a particle sensor have no PM2.5 samples."""
+    coordinator, peripheral = create_virtual_device(hass, model)
+    await coordinator.async_refresh()
+    assert (get_measurements(coordinator.data.info)["pm25"] is None) is not has_pm25
+
+    coordinator.async_start_burst(timedelta(seconds=0.2), 0.05)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    statistics = coordinator.last_burst["statistics"]
+    assert statistics["humidity"]["count"] == coordinator.last_burst["samples"] > 0
+    assert statistics["pm25"]["count"] == (
+        coordinator.last_burst["samples"] if has_pm25 else 0
+    )
+    assert not coordinator.burst_active
+    assert not peripheral.is_connected
+    await coordinator.async_shutdown()
+
+
+async def test_burst_disconnects_on_unload(hass: HomeAssistant) -> None:
+    """Test a running burst is stopped and disconnected on unload."""
+    coordinator, peripheral = create_virtual_device(hass, "W400")
+    entry = coordinator.config_entry
+    await coordinator.async_refresh()
+    entry.mock_state(hass, ConfigEntryState.LOADED)
+    sampled = asyncio.Event()
+    coordinator.async_add_measurement_listener(lambda *_: sampled.set())
+
+    coordinator.async_start_burst(timedelta(hours=1), 60)
+    await sampled.wait()
+    assert peripheral.is_connected
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert not coordinator.burst_active
+    assert coordinator.last_burst["samples"] == 1
+    assert not peripheral.is_connected
+
+
+async def test_burst_too_many_samples(hass: HomeAssistant) -> None:
+    """Test bursts which don't fit into the buffer are rejected."""
+    async_setup_services(hass)
+
+    with pytest.raises(ServiceValidationError, match="at most 3600 samples"):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_START_BURST,
+            {ATTR_DEVICE_ID: ["device"], "duration": "02:00:00", "interval": 1},
+            blocking=True,
+        )
@@ -0,0 +1,119 @@
+"""Tests for the Boneco config flow."""
+
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+from bleak.backends.device import BLEDevice
+from habluetooth import BluetoothServiceInfoBleak
+from pyboneco import BonecoAuth
+from virtual_boneco import VirtualBonecoClient, VirtualBonecoPeripheral
+
+from custom_components.boneco.const import DOMAIN
+from homeassistant.config_entries import SOURCE_USER
+from homeassistant.const import CONF_ADDRESS, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+# Marker, version, build date and the pairing flag
+PAIRING_ADVERTISEMENT = {0x0299: bytes([66, 0, 1, 0, 0xE8, 0x07, 1, 1, 1])}
+
+
+class _WrongKeyPeripheral(VirtualBonecoPeripheral):
+    """Confirms pairing, but hands out a key it doesn't accept."""
+
+    def _handle_auth(self, data: bytes) -> None:
+        super()._handle_auth(data)
+        if data[0] == 5:
+            self.device_key = os.urandom(16)
+
+
+def _service_info(address: str, model: str) -> BluetoothServiceInfoBleak:
+    return BluetoothServiceInfoBleak(
+        name=model,
+        address=address,
+        rssi=-60,
+        manufacturer_data=PAIRING_ADVERTISEMENT,
+        service_data={},
+        service_uuids=[],
+        source="local",
+        device=BLEDevice(address, model, None),
+        advertisement=None,
+        connectable=True,
+        time=time.monotonic(),
+        tx_power=None,
+    )
+
+
+async def test_bulk_pairing_partial_failure(hass: HomeAssistant) -> None:
+    """Test only devices which handed out a valid key get an entry."""
+    peripherals = {
+        "AA:BB:CC:DD:EE:01": VirtualBonecoPeripheral("W400", confirm_delay=0),
+        # The key exchange fails after the user confirmed pairing
+        "AA:BB:CC:DD:EE:02": _WrongKeyPeripheral("H400", confirm_delay=0),
+        # Pairing is never confirmed on the device
+        "AA:BB:CC:DD:EE:03": VirtualBonecoPeripheral("F225", confirm_delay=60),
+    }
+    service_infos = [
+        _service_info(address, peripheral.device.product_id)
+        for address, peripheral in peripherals.items()
+    ]
+
+    def client(auth_data: BonecoAuth) -> VirtualBonecoClient:
+        return VirtualBonecoClient(auth_data, peripherals[auth_data.address])
+
+    with (
+        patch(
+            "custom_components.boneco.config_flow.bluetooth.async_discovered_service_info",
+            return_value=service_infos,
+        ),
+        patch(
+            "custom_components.boneco.config_flow.bluetooth.async_last_service_info",
+            side_effect=lambda hass, address, connectable: next(
+                info for info in service_infos if info.address == address
+            ),
+        ),
+        patch(
+            "custom_components.boneco.config_flow.bluetooth.async_register_callback",
+            return_value=lambda: None,
+        ),
+        patch("custom_components.boneco.config_flow.BonecoClient", client),
+        patch(
+            "custom_components.boneco.config_flow.WAIT_FOR_CONFIRM_PAIRING_TIMEOUT",
+            0.5,
+        ),
+        patch("custom_components.boneco.async_setup_entry", return_value=True),
+    ):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": SOURCE_USER}
+        )
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"next_step_id": "bulk"}
+        )
+        assert result["type"] is FlowResultType.FORM
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"devices": list(peripherals)}
+        )
+        assert result["type"] is FlowResultType.SHOW_PROGRESS
+
+        async with asyncio.timeout(5):
+            while result["type"] is FlowResultType.SHOW_PROGRESS:
+                await hass.async_block_till_done()
+                result = await hass.config_entries.flow.async_configure(
+                    result["flow_id"]
+                )
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "bulk_pairing_partial"
+    assert result["description_placeholders"] == {
+        "paired": "1",
+        "failed": "2",
+        "failed_devices": "H400 EE02, F225 EE03",
+    }
+    entries = hass.config_entries.async_entries(DOMAIN)
+    assert [entry.data[CONF_ADDRESS] for entry in entries] == ["AA:BB:CC:DD:EE:01"]
+    assert (
+        entries[0].data[CONF_PASSWORD]
+        == peripherals["AA:BB:CC:DD:EE:01"].device_key.hex()
+    )
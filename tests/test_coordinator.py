@@ -0,0 +1,136 @@
+"""Tests for the Boneco coordinator against the device emulator."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+from virtual_boneco import MODELS
+
+from custom_components.boneco.const import CONF_PIPELINED_READS, WRITE_RETRY_MIN_DELAY
+from homeassistant.core import HomeAssistant
+
+from . import create_virtual_device
+
+
+@pytest.mark.parametrize("model", MODELS.values())
+@pytest.mark.parametrize("pipelined", [False, True])
+async def test_poll(hass: HomeAssistant, model: str, pipelined: bool) -> None:
+    """Test a poll reads name, info and state and disconnects."""
+    coordinator, peripheral = create_virtual_device(
+        hass, model, **{CONF_PIPELINED_READS: pipelined}
+    )
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data.name == f"Virtual {model}"
+    assert coordinator.data.info.device.product_id == model
+    assert coordinator.data.state.is_enabled
+    assert coordinator.device_info["name"] == f"Virtual {model}"
+    assert coordinator.metrics.polls == 1
+    assert not peripheral.is_connected
+    await coordinator.async_shutdown()
+
+
+async def test_poll_failure(hass: HomeAssistant) -> None:
+    """Test a device which rejects the key fails the update."""
+    coordinator, peripheral = create_virtual_device(hass, "W400")
+    peripheral.device_key = bytes(16)
+
+    await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
+    assert coordinator.metrics.poll_failures == 1
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        model
+        if model != "H700"
+        else pytest.param(
+            model,
+            marks=pytest.mark.xfail(
+                reason="pyboneco can't encode states with running service counters",
+                strict=True,
+            ),
+        )
+        for model in MODELS.values()
+    ],
+)
+async def test_apply_state(hass: HomeAssistant, model: str) -> None:
+    """Test changes are written to the device and read back."""
+    coordinator, _ = create_virtual_device(hass, model)
+    await coordinator.async_refresh()
+
+    await coordinator.async_apply_state(lambda state: setattr(state, "is_locked", True))
+    await coordinator.async_refresh()
+
+    assert coordinator.data.state.is_locked
+    assert coordinator.metrics.write_failures == 0
+    await coordinator.async_shutdown()
+
+
+async def test_write_retry_backoff(hass: HomeAssistant) -> None:
+    """Test failed writes are retried on advertisements with a backoff."""
+    coordinator, peripheral = create_virtual_device(hass, "W400")
+    await coordinator.async_refresh()
+    device_key = peripheral.device_key
+    peripheral.device_key = bytes(16)
+    advertisement = MagicMock(rssi=-60, connectable=True)
+
+    await coordinator.update_state(lambda state: setattr(state, "is_locked", True))
+    await coordinator._async_set_state()
+    assert coordinator.metrics.write_failures == 1
+    assert coordinator._write_retry_delay == 2 * WRITE_RETRY_MIN_DELAY
+
+    with patch.object(coordinator._debounced_write, "async_schedule_call") as retry:
+        for _ in range(10):
+            coordinator._async_handle_advertisement(advertisement, MagicMock())
+        assert retry.call_count == 0
+
+        # The backoff is over, only one retry is scheduled
+        coordinator._next_write_retry = 0
+        for _ in range(10):
+            coordinator._async_handle_advertisement(advertisement, MagicMock())
+        assert retry.call_count == 1
+
+    peripheral.device_key = device_key
+    await coordinator._async_set_state()
+    assert coordinator.metrics.retries == 1
+    assert coordinator._write_retry_delay == WRITE_RETRY_MIN_DELAY
+    assert coordinator._next_write_retry == 0
+    await hass.async_block_till_done()
+    assert coordinator.data.state.is_locked
+    await coordinator.async_shutdown()
+
+
+async def test_pipelined_read_failure(hass: HomeAssistant) -> None:
+    """Test a failed pipelined read cancels the other reads."""
+    coordinator, peripheral = create_virtual_device(
+        hass, "W400", **{CONF_PIPELINED_READS: True}
+    )
+    client = coordinator._client
+    cancelled = asyncio.Event()
+
+    async def get_state() -> None:
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            # Still connected, the disconnect comes after the cancellation
+            assert peripheral.is_connected
+            cancelled.set()
+            raise
+
+    with (
+        patch.object(client, "get_device_info", side_effect=ConnectionError("lost")),
+        patch.object(client, "get_state", get_state),
+    ):
+        await coordinator.async_refresh()
+
+    assert cancelled.is_set()
+    assert not coordinator.last_update_success
+    assert str(coordinator.last_exception) == "Unable to fetch data: lost"
+    assert not peripheral.is_connected
+    await coordinator.async_shutdown()
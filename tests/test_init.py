@@ -0,0 +1,18 @@
+"""Tests for the setup of the Boneco integration."""
+
+from custom_components.boneco.const import DOMAIN
+from homeassistant.components.websocket_api import DOMAIN as WS_DOMAIN
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+
+async def test_setup(hass: HomeAssistant) -> None:
+    """Test actions, the websocket API and the metrics view are registered."""
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    assert hass.services.has_service(DOMAIN, "set_state")
+    assert "boneco/subscribe_measurements" in hass.data[WS_DOMAIN]
+    assert any(
+        resource.canonical == "/api/boneco/metrics"
+        for resource in hass.http.app.router.resources()
+    )
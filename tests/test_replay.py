@@ -0,0 +1,91 @@
+"""Tests for replaying recorded traffic through the coordinator."""
+
+import gzip
+from pathlib import Path
+import shutil
+
+import pytest
+from replay_traffic import async_replay, create_replay_coordinator
+
+from custom_components.boneco.const import CONF_PIPELINED_READS
+from custom_components.boneco.traffic import BonecoTrafficRecording
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+FIXTURES = Path(__file__).parent / "fixtures" / "traffic"
+SPEED = 100
+
+
+def _load(tmp_path: Path, scenario: str) -> BonecoTrafficRecording:
+    """Load a scenario the way recordings are saved."""
+    path = tmp_path / f"{scenario}.jsonl.gz"
+    with (
+        (FIXTURES / f"{scenario}.jsonl").open("rb") as src,
+        gzip.open(path, "wb") as dst,
+    ):
+        shutil.copyfileobj(src, dst)
+    return BonecoTrafficRecording.load(path)
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+async def test_replay_poll_and_write(
+    hass: HomeAssistant, tmp_path: Path, pipelined: bool
+) -> None:
+    """Test polls and writes of a healthy device."""
+    coordinator = create_replay_coordinator(
+        hass,
+        _load(tmp_path, "w400_poll_and_write"),
+        {CONF_PIPELINED_READS: pipelined},
+        SPEED,
+    )
+
+    result = await async_replay(coordinator, polls=1, write_every=1, speed=SPEED)
+
+    assert result.failures == {"poll": 0, "write": 0}
+    assert len(result.durations["poll"]) == len(result.durations["write"]) == 1
+    assert coordinator.last_update_success
+    assert coordinator.data.name == "Bedroom"
+    assert coordinator.data.info.humidity == 45
+    # Read back by the refresh after the write
+    assert coordinator.data.state.is_locked
+    assert coordinator.metrics.polls == 2
+    assert coordinator.metrics.write_failures == 0
+    await coordinator.async_shutdown()
+
+
+async def test_replay_connect_timeout(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test a recorded connect timeout fails only its poll."""
+    coordinator = create_replay_coordinator(
+        hass, _load(tmp_path, "w400_connect_timeout"), speed=SPEED
+    )
+
+    result = await async_replay(coordinator, polls=2, speed=SPEED)
+
+    assert result.failures["poll"] == 1
+    assert not coordinator.last_update_success
+    assert isinstance(coordinator.last_exception, UpdateFailed)
+    assert coordinator.timeout_counts["connect"] == 1
+    # Data of the last successful poll is kept
+    assert coordinator.data.name == "Bedroom"
+
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.metrics.poll_failures == 1
+    await coordinator.async_shutdown()
+
+
+async def test_replay_read_error(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test a recorded read error of a top climate device fails its poll."""
+    coordinator = create_replay_coordinator(
+        hass, _load(tmp_path, "h700_read_error"), speed=SPEED
+    )
+
+    result = await async_replay(coordinator, polls=2, speed=SPEED)
+
+    assert result.failures["poll"] == 1
+    assert not coordinator.last_update_success
+    assert "Replayed BleakError" in str(coordinator.last_exception)
+    assert coordinator.data.name == "Office"
+    assert coordinator.data.info.has_particle_sensor
+    assert coordinator.metrics.poll_failures == 1
+    await coordinator.async_shutdown()
@@ -0,0 +1,52 @@
+"""Tests for the websocket API of the Boneco integration."""
+
+import asyncio
+from datetime import timedelta
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.typing import WebSocketGenerator
+
+from custom_components.boneco.const import DOMAIN
+from custom_components.boneco.websocket import async_setup_websocket_api
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util import dt as dt_util
+
+from . import ADDRESS, create_virtual_device
+
+
+async def test_subscribe_measurements_after_reload(
+    hass: HomeAssistant, hass_ws_client: WebSocketGenerator
+) -> None:
+    """Test subscriptions follow the coordinator of a reloaded device."""
+    coordinator, _ = create_virtual_device(hass, "W400")
+    entry = coordinator.config_entry
+    await coordinator.async_refresh()
+    entry.mock_state(hass, ConfigEntryState.LOADED)
+    device = dr.async_get(hass).async_get_or_create(
+        config_entry_id=entry.entry_id, identifiers={(DOMAIN, ADDRESS)}
+    )
+    async_setup_websocket_api(hass)
+    client = await hass_ws_client(hass)
+
+    await client.send_json_auto_id(
+        {"type": "boneco/subscribe_measurements", "device_id": device.id}
+    )
+    assert (await client.receive_json())["success"]
+    event = (await client.receive_json())["event"]
+    assert event["device_id"] == device.id
+    assert event["humidity"] == 45
+    assert event["pm25"] is None
+
+    # Reloading shuts the coordinator down and creates a new one
+    await coordinator.async_shutdown()
+    reloaded, _ = create_virtual_device(hass, "W400", entry)
+    await reloaded.async_refresh()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+
+    async with asyncio.timeout(1):
+        event = (await client.receive_json())["event"]
+    assert event["device_id"] == device.id
+    assert not coordinator._measurement_listeners
+    assert len(reloaded._measurement_listeners) == 1